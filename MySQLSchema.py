@@ -0,0 +1,228 @@
+import datetime
+import json
+import math
+import re
+from typing import Callable, Dict, List, Optional, Sequence
+
+# Name of the surrogate primary key added to every collector table
+SURROGATE_KEY = "row_id"
+
+# Column types for fields whose meaning is known regardless of what the sample rows look like
+KNOWN_COLUMN_TYPES = {
+    "date_queried": "DATETIME(3)",
+    "pointInTime": "DATETIME(3)",
+    "CreationTime": "DATETIME(3)",
+    "ProcessingTime": "DATETIME(3)",
+    "Started": "DATETIME(3)",
+    "Ended": "DATETIME(3)",
+    "NextStart": "DATETIME(3)",
+    "QueueDefinitionId": "BIGINT",
+    "FolderId": "BIGINT",
+    "Reason": "TEXT",
+    "run_id": "CHAR(32)",
+}
+
+# Columns that dashboards filter or sort on; they get a secondary index
+TIME_COLUMNS = {name for name, column_type in KNOWN_COLUMN_TYPES.items() if column_type.startswith("DATETIME")}
+
+# Rollup granularities: SQL expression truncating a time column to the bucket start, and bucket width
+ROLLUP_GRAINS = {
+    "hourly": ("TIMESTAMP(DATE(`{column}`), MAKETIME(HOUR(`{column}`), 0, 0))", datetime.timedelta(hours=1)),
+    "daily": ("TIMESTAMP(DATE(`{column}`))", datetime.timedelta(days=1)),
+}
+
+# Catch-all partition of a time-partitioned table, split up as upcoming partitions are pre-created
+FUTURE_PARTITION = "p_future"
+
+NUMERIC_TYPES = {"tinyint", "smallint", "mediumint", "int", "bigint", "double", "float", "decimal"}
+
+TEXT_TYPES = {"char", "varchar", "tinytext", "text", "mediumtext", "longtext"}
+
+# Length of the VARCHAR columns created for short strings; longer values go to TEXT
+VARCHAR_LENGTH = 255
+
+ISO_DATETIME = re.compile(r"^\d{4}-\d{2}-\d{2}[T ]\d{2}:\d{2}(:\d{2}(\.\d+)?)?(Z|[+-]\d{2}:?\d{2})?$")
+
+
+def is_missing(value) -> bool:
+    # pandas hands missing values over as NaN; they are stored as NULL
+    return value is None or (isinstance(value, float) and math.isnan(value))
+
+
+def infer_column_type(name: str, values: Sequence) -> str:
+    """
+    Pick a MySQL column type for a column from its name and a sample of its values.
+
+    Known fields come from KNOWN_COLUMN_TYPES; everything else is inferred from the
+    Python types of the non-null sample values, falling back to VARCHAR(VARCHAR_LENGTH).
+    """
+    if name in KNOWN_COLUMN_TYPES:
+        return KNOWN_COLUMN_TYPES[name]
+
+    present = [value for value in values if not is_missing(value)]
+    if not present:
+        return f"VARCHAR({VARCHAR_LENGTH})"
+    if all(isinstance(value, bool) for value in present):
+        return "TINYINT(1)"
+    if all(isinstance(value, int) and not isinstance(value, bool) for value in present):
+        return "BIGINT"
+    if all(isinstance(value, (int, float)) and not isinstance(value, bool) for value in present):
+        return "DOUBLE"
+    if all(isinstance(value, datetime.datetime) for value in present):
+        return "DATETIME(3)"
+    if all(isinstance(value, str) and ISO_DATETIME.match(value) for value in present):
+        return "DATETIME(3)"
+    if any(isinstance(value, (dict, list)) for value in present):
+        return "TEXT"
+    if any(len(str(value)) > VARCHAR_LENGTH for value in present):
+        return "TEXT"
+    return f"VARCHAR({VARCHAR_LENGTH})"
+
+
+def is_indexable(column: str, column_type: str) -> bool:
+    return column in TIME_COLUMNS or column_type.upper().startswith("DATETIME")
+
+
+def index_name(column: str) -> str:
+    return f"ix_{column}"[:64]
+
+
+def create_table_ddl(
+    table: str,
+    columns: List[str],
+    types: Dict[str, str],
+    key_columns: Optional[List[str]] = None,
+    partition_column: Optional[str] = None,
+    partitions: Optional[List[str]] = None
+) -> str:
+    """
+    CREATE TABLE IF NOT EXISTS statement with a surrogate primary key, typed columns,
+    an index on every time column and an optional unique natural key.
+
+    With partition_column the table is RANGE partitioned on it (see partition_definitions()).
+    MySQL requires the partition column in every unique key, so it is added to the primary
+    key and the natural key.
+    """
+    if partition_column:
+        definitions = [f"`{SURROGATE_KEY}` BIGINT UNSIGNED NOT NULL AUTO_INCREMENT"]
+    else:
+        definitions = [f"`{SURROGATE_KEY}` BIGINT UNSIGNED NOT NULL AUTO_INCREMENT PRIMARY KEY"]
+    definitions += [f"`{col}` {types[col]}" for col in columns]
+    if partition_column:
+        definitions.append(f"PRIMARY KEY (`{SURROGATE_KEY}`, `{partition_column}`)")
+    definitions += [f"KEY `{index_name(col)}` (`{col}`)" for col in columns if is_indexable(col, types[col])]
+    if key_columns:
+        unique_columns = natural_key_columns(key_columns, partition_column)
+        definitions.append(f"UNIQUE KEY `uq_natural_key` ({', '.join(f'`{col}`' for col in unique_columns)})")
+    ddl = f"CREATE TABLE IF NOT EXISTS {table} ({', '.join(definitions)})"
+    if partition_column:
+        ddl += f" PARTITION BY RANGE COLUMNS(`{partition_column}`) ({', '.join(partitions)})"
+    return ddl
+
+
+def natural_key_columns(key_columns: List[str], partition_column: Optional[str] = None) -> List[str]:
+    if partition_column and partition_column not in key_columns:
+        return list(key_columns) + [partition_column]
+    return list(key_columns)
+
+
+def partition_start(day: datetime.date, period_days: int) -> datetime.date:
+    """
+    First day of the partition period holding a day. Periods are counted from 0001-01-01,
+    a Monday, so weekly partitions always start on a Monday.
+    """
+    ordinal = day.toordinal()
+    return datetime.date.fromordinal(ordinal - (ordinal - 1) % period_days)
+
+
+def partition_name(start: datetime.date) -> str:
+    return f"p{start:%Y%m%d}"
+
+
+def parse_partition_name(name: str) -> Optional[datetime.date]:
+    try:
+        return datetime.datetime.strptime(name, "p%Y%m%d").date()
+    except ValueError:
+        return None  # The catch-all partition or one not created by the collector
+
+
+def partition_definitions(starts: List[datetime.date], period_days: int) -> List[str]:
+    """
+    One RANGE partition per period start, followed by the catch-all FUTURE_PARTITION that
+    keeps inserts working for times past the last pre-created partition.
+    """
+    definitions = [f"PARTITION `{partition_name(start)}` VALUES LESS THAN "
+                   f"('{start + datetime.timedelta(days=period_days)}')" for start in starts]
+    return definitions + [f"PARTITION `{FUTURE_PARTITION}` VALUES LESS THAN (MAXVALUE)"]
+
+
+def rollup_table_ddl(table: str, measures: List[str]) -> str:
+    """
+    CREATE TABLE IF NOT EXISTS statement for a rollup: one row per bucket start, the number of
+    raw points in the bucket and one aggregated column per measure.
+    """
+    definitions = ["`bucket` DATETIME NOT NULL PRIMARY KEY", "`points` INT NOT NULL"]
+    definitions += [f"`{col}` DOUBLE" for col in measures]
+    return f"CREATE TABLE IF NOT EXISTS {table} ({', '.join(definitions)})"
+
+
+def bucket_start(value: datetime.datetime, grain: str) -> datetime.datetime:
+    if grain == "daily":
+        return value.replace(hour=0, minute=0, second=0, microsecond=0)
+    return value.replace(minute=0, second=0, microsecond=0)
+
+
+def _to_datetime(value):
+    if isinstance(value, datetime.datetime):
+        if value.tzinfo is not None:
+            value = value.astimezone(datetime.timezone.utc).replace(tzinfo=None)
+        return value
+    if isinstance(value, str) and ISO_DATETIME.match(value.strip()):
+        parsed = datetime.datetime.fromisoformat(value.strip().replace("Z", "+00:00"))
+        if parsed.tzinfo is not None:
+            parsed = parsed.astimezone(datetime.timezone.utc).replace(tzinfo=None)
+        return parsed
+    # Placeholders such as "N/A" cannot be stored in a DATETIME column
+    return None
+
+
+def _to_int(value):
+    try:
+        return int(float(value)) if not isinstance(value, int) else int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _to_float(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _to_text(value):
+    if isinstance(value, (dict, list)):
+        return json.dumps(value)
+    return value
+
+
+def converter_for(data_type: str) -> Callable:
+    """
+    Return a function that turns an API value into something pymysql can store in a column
+    of the given information_schema DATA_TYPE.
+    """
+    data_type = data_type.lower()
+    if data_type in ("datetime", "timestamp"):
+        return _to_datetime
+    if data_type in ("tinyint", "smallint", "mediumint", "int", "bigint"):
+        return _to_int
+    if data_type in ("double", "float", "decimal"):
+        return _to_float
+    return _to_text
+
+
+def base_type(column_type: str) -> str:
+    """
+    DATA_TYPE as information_schema reports it, e.g. DATETIME(3) -> datetime.
+    """
+    return column_type.split("(", 1)[0].strip().lower()
@@ -0,0 +1,570 @@
+import datetime
+import itertools
+import queue
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import pymysql
+
+from metrics import DB_LAST_WRITE, DB_ROWS_WRITTEN, DB_WRITE_SECONDS
+from MySQLSchema import (FUTURE_PARTITION, NUMERIC_TYPES, ROLLUP_GRAINS, SURROGATE_KEY, TEXT_TYPES, VARCHAR_LENGTH,
+                         base_type, bucket_start, converter_for, create_table_ddl, index_name, infer_column_type,
+                         is_indexable, is_missing, natural_key_columns, parse_partition_name, partition_definitions,
+                         partition_name, partition_start, rollup_table_ddl)
+
+
+class MySQLConnectionPool:
+    """
+    A small thread-safe pool of pymysql connections to one MySQL server.
+
+    Connections are opened lazily, up to pool_size, and handed back to the pool
+    after every use so that repeated writes do not pay for a new TCP + auth
+    handshake each time. Connections are not bound to a database; callers
+    qualify table names with the schema instead.
+    """
+    def __init__(self, host: str, user: str, password: str, pool_size: int = 4, connect_timeout: int = 10):
+        self.host = host
+        self.user = user
+        self.password = password
+        self.pool_size = pool_size
+        self.connect_timeout = connect_timeout
+        self._idle = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(pool_size)
+
+    def _connect(self):
+        return pymysql.connect(
+            host=self.host,
+            user=self.user,
+            password=self.password,
+            charset="utf8mb4",
+            connect_timeout=self.connect_timeout,
+            autocommit=False
+        )
+
+    @contextmanager
+    def connection(self):
+        """
+        Borrow a connection for the duration of a with-block.
+
+        A connection that raised inside the block is closed rather than returned,
+        so a broken socket never goes back into the pool.
+        """
+        self._slots.acquire()
+        try:
+            try:
+                connection = self._idle.get_nowait()
+                connection.ping(reconnect=True)
+            except queue.Empty:
+                connection = self._connect()
+
+            try:
+                yield connection
+            except Exception:
+                try:
+                    connection.close()
+                except Exception:
+                    pass
+                raise
+            else:
+                self._idle.put(connection)
+        finally:
+            self._slots.release()
+
+    def close(self):
+        while True:
+            try:
+                connection = self._idle.get_nowait()
+            except queue.Empty:
+                return
+            try:
+                connection.close()
+            except Exception:
+                pass
+
+
+class MySQLWriter:
+    """
+    Writes rows into tables of one MySQL schema using a shared connection pool.
+
+    Rows are sent in chunks of batch_size through cursor.executemany, which pymysql
+    rewrites into multi-row INSERT ... VALUES statements, so a write costs one round
+    trip per chunk instead of one per row. Tables are created with typed columns
+    inferred from the first chunk (see MySQLSchema) and values are converted to the
+    column types before they are sent. A VARCHAR column that later receives a longer
+    value is widened to TEXT (see _widen_columns()).
+
+    Snapshot tables (trunc=True) are never emptied in place: the new rows are loaded
+    into a staging copy of the table and swapped in with a single RENAME TABLE, so
+    readers see either the previous snapshot or the new one, never a partial one.
+
+    History tables registered with partition_table() are created RANGE partitioned by
+    day or week on their time column; maintain_partitions() pre-creates upcoming
+    partitions and drops the ones past retention.
+
+    A write may carry the collector state it advances (watermarks, dedup hashes); it is
+    saved to state_store, a StateStore, only once the rows are committed.
+    """
+    def __init__(self, pool: MySQLConnectionPool, database: str, batch_size: int = 500, state_store=None):
+        self.pool = pool
+        self.database = database
+        self.batch_size = batch_size
+        self.state_store = state_store
+        self.stats: Dict[str, Dict[str, float]] = {}
+        self._stats_lock = threading.Lock()
+        # Column name -> information_schema DATA_TYPE for tables this writer has already prepared
+        self._prepared: Dict[str, Dict[str, str]] = {}
+        # Table -> partitioning settings, see partition_table()
+        self.partitioning: Dict[str, Dict] = {}
+        self._database_created = False
+
+    def _qualified(self, table_name: str) -> str:
+        return f"`{self.database}`.`{table_name}`"
+
+    def _insert_query(self, table_name: str, columns: List[str], key_columns: Optional[List[str]] = None) -> str:
+        column_list = ", ".join(f"`{col}`" for col in columns)
+        placeholders = ", ".join(["%s"] * len(columns))
+        insert_query = f"INSERT INTO {self._qualified(table_name)} ({column_list}) VALUES ({placeholders})"
+        if key_columns:
+            updates = ", ".join(f"`{col}` = VALUES(`{col}`)" for col in columns if col not in key_columns)
+            insert_query += f" ON DUPLICATE KEY UPDATE {updates or f'`{key_columns[0]}` = `{key_columns[0]}`'}"
+        return insert_query
+
+    def _create_staging(self, cursor, table_name: str) -> str:
+        """
+        Create an empty copy of a prepared table (same columns, keys and indexes) to load a snapshot into.
+        A staging table left behind by a failed run is dropped first.
+        """
+        staging_name = f"{table_name}__staging"
+        cursor.execute(f"DROP TABLE IF EXISTS {self._qualified(staging_name)}")
+        cursor.execute(f"CREATE TABLE {self._qualified(staging_name)} LIKE {self._qualified(table_name)}")
+        self._prepared.pop(staging_name, None)
+        return staging_name
+
+    def _swap_in(self, cursor, table_name: str, staging_name: str):
+        """
+        Replace a table with its loaded staging copy. RENAME TABLE swaps both names in one
+        atomic metadata operation, so the swap takes the same time however many rows there are.
+        """
+        table = self._qualified(table_name)
+        old = self._qualified(f"{table_name}__old")
+        cursor.execute(f"DROP TABLE IF EXISTS {old}")
+        cursor.execute(f"RENAME TABLE {table} TO {old}, {self._qualified(staging_name)} TO {table}")
+        cursor.execute(f"DROP TABLE {old}")
+
+    def _record(self, table_name: str, rows: int, seconds: float):
+        with self._stats_lock:
+            table_stats = self.stats.setdefault(table_name, {"rows": 0, "seconds": 0.0, "writes": 0})
+            table_stats["rows"] += rows
+            table_stats["seconds"] += seconds
+            table_stats["writes"] += 1
+
+    def _existing_columns(self, cursor, table_name: str) -> Dict[str, str]:
+        cursor.execute(
+            "SELECT COLUMN_NAME, DATA_TYPE FROM information_schema.COLUMNS WHERE TABLE_SCHEMA = %s AND TABLE_NAME = %s",
+            (self.database, table_name)
+        )
+        return {row[0]: row[1] for row in cursor.fetchall()}
+
+    def _existing_indexes(self, cursor, table_name: str) -> set:
+        cursor.execute(
+            "SELECT DISTINCT INDEX_NAME FROM information_schema.STATISTICS WHERE TABLE_SCHEMA = %s AND TABLE_NAME = %s",
+            (self.database, table_name)
+        )
+        return {row[0] for row in cursor.fetchall()}
+
+    def _prepare_table(
+        self,
+        cursor,
+        table_name: str,
+        columns: List[str],
+        sample_rows: List[Sequence],
+        key_columns: Optional[List[str]] = None
+    ) -> Dict[str, str]:
+        """
+        Create the table with typed columns if needed and bring an existing table up to date:
+        add columns the payload has gained, a surrogate primary key, indexes on time columns
+        and the unique natural key used for upserts. Returns the column -> DATA_TYPE map.
+        """
+        table = self._qualified(table_name)
+        known = self._prepared.get(table_name)
+        if known is not None and all(col in known for col in columns):
+            return known
+
+        if not self._database_created:
+            # Created here rather than once up front, so a schema MySQL could not create at startup
+            # still exists before the first write (or spooled flush) reaches it
+            cursor.execute(f"CREATE DATABASE IF NOT EXISTS `{self.database}`")
+            self._database_created = True
+
+        types = {col: infer_column_type(col, [row[i] for row in sample_rows]) for i, col in enumerate(columns)}
+        partition_column, partitions = None, None
+        spec = self.partitioning.get(table_name)
+        if spec and spec["column"] in columns:
+            partition_column = spec["column"]
+            partitions = partition_definitions(self._wanted_partitions(spec), spec["period_days"])
+        cursor.execute(create_table_ddl(table, columns, types, key_columns, partition_column, partitions))
+
+        existing = self._existing_columns(cursor, table_name)
+        for col in columns:
+            if col not in existing:
+                cursor.execute(f"ALTER TABLE {table} ADD COLUMN `{col}` {types[col]}")
+                existing[col] = base_type(types[col])
+
+        indexes = self._existing_indexes(cursor, table_name)
+        if "PRIMARY" not in indexes and SURROGATE_KEY not in existing:
+            # Tables created before typed schemas have no key at all
+            cursor.execute(f"ALTER TABLE {table} ADD COLUMN `{SURROGATE_KEY}` BIGINT UNSIGNED NOT NULL AUTO_INCREMENT PRIMARY KEY FIRST")
+            existing[SURROGATE_KEY] = "bigint"
+
+        for col in columns:
+            if is_indexable(col, types[col]) and existing[col] not in ("text", "json", "blob") \
+                    and index_name(col) not in indexes:
+                cursor.execute(f"ALTER TABLE {table} ADD INDEX `{index_name(col)}` (`{col}`)")
+
+        if key_columns and "uq_natural_key" not in indexes:
+            unique_columns = natural_key_columns(key_columns, spec["column"] if spec else None)
+            add_key = f"ALTER TABLE {table} ADD UNIQUE KEY `uq_natural_key` ({', '.join(f'`{col}`' for col in unique_columns)})"
+            try:
+                cursor.execute(add_key)
+            except pymysql.err.IntegrityError:
+                # Rows appended before the table had a natural key overlap; keep the newest copy of each
+                matches = " AND ".join(f"older.`{col}` <=> newer.`{col}`" for col in key_columns)
+                cursor.execute(
+                    f"DELETE older FROM {table} AS older JOIN {table} AS newer "
+                    f"ON {matches} AND older.`{SURROGATE_KEY}` < newer.`{SURROGATE_KEY}`")
+                print(f"Removed {cursor.rowcount} duplicate rows from {table_name} before adding its natural key")
+                cursor.execute(add_key)
+
+        self._prepared[table_name] = existing
+        return existing
+
+    def _widen_columns(
+        self,
+        cursor,
+        table_name: str,
+        columns: List[str],
+        column_types: Dict[str, str],
+        rows: List[Sequence],
+        key_columns: Optional[List[str]] = None
+    ):
+        """
+        Turn VARCHAR columns into TEXT when a chunk holds a value too long for them, which strict
+        mode would otherwise reject along with the whole write. Natural key columns are left
+        alone, since a TEXT column cannot be part of a unique key.
+        """
+        for i, col in enumerate(columns):
+            if column_types.get(col) != "varchar" or col in (key_columns or ()):
+                continue
+            if any(isinstance(row[i], str) and len(row[i]) > VARCHAR_LENGTH for row in rows):
+                cursor.execute(f"ALTER TABLE {self._qualified(table_name)} MODIFY COLUMN `{col}` TEXT")
+                column_types[col] = "text"
+                print(f"Widened {table_name}.{col} to TEXT for values over {VARCHAR_LENGTH} characters")
+
+    def write_batches(
+        self,
+        table_name: str,
+        batches: Iterable[Tuple[List[str], Iterable[Sequence]]],
+        trunc: bool = False,
+        key_columns: Optional[List[str]] = None,
+        missing_text: Optional[str] = None,
+        state: Optional[Dict] = None
+    ) -> int:
+        """
+        Writes a stream of row batches to a MySQL table, creating the table if it does not exist.
+        Batches are consumed one at a time, so a caller can pass a generator that fetches each page
+        from the API only when the previous one has been written.
+
+        A pooled connection is borrowed for each chunk of batch_size rows and returned before the
+        next one is pulled, so a slow page fetch upstream never holds a connection other tenants
+        are waiting for. Each chunk commits on its own; a snapshot (trunc) is still replaced
+        atomically, because its chunks go to a staging table that is swapped in at the end.
+
+        Args:
+            table_name (str): The name of the table in MySQL.
+            batches (Iterable[Tuple[List[str], Iterable[Sequence]]]): (columns, rows) pairs. Each batch
+                names its own columns, so later pages may carry fields earlier ones did not.
+            trunc (bool): Replace the table's contents with the rows. The rows are loaded into a
+                staging table which is then swapped in atomically (see _swap_in()). With no rows,
+                an existing table is replaced by an empty copy.
+            key_columns (List[str]): Natural key of the table. When given, rows are upserted on
+                that key (INSERT ... ON DUPLICATE KEY UPDATE) instead of appended.
+            missing_text (str): Stored in place of missing values in text columns, e.g. "N/A".
+                Applied after the column types are known, so numeric and time columns stay NULL.
+            state (Dict): Collector state to save to state_store once every row is committed.
+
+        Returns:
+            int: The number of rows written.
+        """
+        started = time.perf_counter()
+        written = 0
+        staging_name = None
+        for columns, rows in batches:
+            if not columns:
+                continue
+            rows = iter(rows)
+            chunk = list(itertools.islice(rows, self.batch_size))
+            while True:
+                with self.pool.connection() as connection:
+                    with connection.cursor() as cursor:
+                        if trunc and staging_name is None:
+                            # The live table is brought up to date first so the staging copy inherits its schema
+                            self._prepare_table(cursor, table_name, columns, chunk, key_columns)
+                            staging_name = self._create_staging(cursor, table_name)
+                        self._write_chunk(cursor, staging_name or table_name, columns, chunk, key_columns, missing_text)
+                    connection.commit()
+                written += len(chunk)
+                chunk = list(itertools.islice(rows, self.batch_size))
+                if not chunk:
+                    break
+
+        if trunc:
+            with self.pool.connection() as connection:
+                with connection.cursor() as cursor:
+                    if staging_name is None and self._existing_columns(cursor, table_name):
+                        # An empty snapshot (every trigger re-enabled, no machine in maintenance) still replaces the old rows
+                        staging_name = self._create_staging(cursor, table_name)
+                    if staging_name is not None:
+                        self._swap_in(cursor, table_name, staging_name)
+                        prepared = self._prepared.pop(staging_name, None)
+                        if prepared is not None:
+                            self._prepared[table_name] = prepared
+                connection.commit()
+
+        if state and self.state_store is not None:
+            self.state_store.set_many(state)
+
+        if staging_name is None and not written:
+            return 0
+
+        elapsed = time.perf_counter() - started
+        self._record(table_name, written, elapsed)
+        DB_WRITE_SECONDS.observe(elapsed, schema=self.database, table=table_name)
+        DB_ROWS_WRITTEN.inc(written, schema=self.database, table=table_name)
+        DB_LAST_WRITE.set_to_current_time(schema=self.database, table=table_name)
+        rate = written / elapsed if elapsed > 0 else 0.0
+        print(f" {written} rows written to {table_name} table in MySQL in {elapsed:.3f}s ({rate:.0f} rows/s).")
+        return written
+
+    def _write_chunk(
+        self,
+        cursor,
+        table_name: str,
+        columns: List[str],
+        chunk: List[Sequence],
+        key_columns: Optional[List[str]] = None,
+        missing_text: Optional[str] = None
+    ):
+        """
+        Convert one chunk of rows to the column types and insert it with a single executemany.
+        The first chunk a table sees creates it (see _prepare_table()), even when it has no rows.
+        """
+        column_types = self._prepare_table(cursor, table_name, columns, chunk, key_columns)
+        if not chunk:
+            return
+        converters = [converter_for(column_types.get(col, "varchar")) for col in columns]
+        fills = [missing_text if column_types.get(col, "varchar") in TEXT_TYPES else None for col in columns]
+        values = [tuple(fill if is_missing(value) else conv(value) for conv, fill, value in zip(converters, fills, row))
+                  for row in chunk]
+        self._widen_columns(cursor, table_name, columns, column_types, values, key_columns)
+        cursor.executemany(self._insert_query(table_name, columns, key_columns), values)
+
+    def write_rows(
+        self,
+        table_name: str,
+        columns: List[str],
+        rows: Iterable[Sequence],
+        trunc: bool = False,
+        key_columns: Optional[List[str]] = None,
+        missing_text: Optional[str] = None,
+        state: Optional[Dict] = None
+    ) -> int:
+        """
+        Writes rows to a MySQL table, creating the table if it does not exist. See write_batches().
+
+        Args:
+            table_name (str): The name of the table in MySQL.
+            columns (List[str]): Column names, in the same order as the values in each row.
+            rows (Iterable[Sequence]): The rows to insert.
+            trunc (bool): Replace the table's contents with the rows.
+            key_columns (List[str]): Natural key of the table, rows are upserted on it when given.
+            missing_text (str): Stored in place of missing values in text columns.
+            state (Dict): Collector state to save once the rows are committed.
+
+        Returns:
+            int: The number of rows written.
+        """
+        return self.write_batches(table_name, [(columns, rows)], trunc=trunc, key_columns=key_columns,
+                                  missing_text=missing_text, state=state)
+
+    def write_batch(self, batch, table_name: str, trunc: bool = False, key_columns: Optional[List[str]] = None,
+                    missing_text: Optional[str] = None, state: Optional[Dict] = None) -> int:
+        """
+        Writes a RecordBatch to a MySQL table. See write_rows().
+        """
+        return self.write_rows(table_name, batch.columns, batch.rows(), trunc=trunc, key_columns=key_columns,
+                               missing_text=missing_text, state=state)
+
+    def write_batch_pages(self, batches: Iterable, table_name: str, trunc: bool = False,
+                          key_columns: Optional[List[str]] = None, missing_text: Optional[str] = None,
+                          state: Optional[Dict] = None) -> int:
+        """
+        Writes a stream of RecordBatches, e.g. one per API page, to a MySQL table. See write_batches().
+        """
+        return self.write_batches(table_name, ((batch.columns, batch.rows()) for batch in batches),
+                                  trunc=trunc, key_columns=key_columns, missing_text=missing_text, state=state)
+
+    def refresh_rollups(
+        self,
+        table_name: str,
+        time_column: str,
+        start,
+        end,
+        aggregates: Optional[Dict[str, str]] = None,
+        default_aggregate: str = "SUM",
+        grains: Sequence[str] = ("hourly", "daily")
+    ):
+        """
+        Recompute the rollup buckets of a table that overlap [start, end] from its raw rows.
+
+        Each grain is kept in its own table (e.g. transactions_timeline_hourly) keyed by bucket
+        start. Only the affected buckets are re-aggregated and upserted, so the cost depends on
+        the size of the new data, not of the history. Every numeric column of the raw table is
+        a measure.
+
+        Args:
+            table_name (str): The raw table.
+            time_column (str): DATETIME column the buckets are taken from.
+            start, end (datetime): Earliest and latest time of the rows just written.
+            aggregates (Dict[str, str]): Aggregate function per measure, for columns that should not
+                use default_aggregate (e.g. MAX for a gauge such as running jobs).
+            default_aggregate (str): Aggregate function for the other measures.
+            grains (Sequence[str]): Rollups to maintain, keys of ROLLUP_GRAINS.
+        """
+        aggregates = aggregates or {}
+        with self.pool.connection() as connection:
+            with connection.cursor() as cursor:
+                raw_columns = self._existing_columns(cursor, table_name)
+                measures = [col for col, data_type in raw_columns.items()
+                            if data_type in NUMERIC_TYPES and col != SURROGATE_KEY]
+                for grain in grains:
+                    bucket_expression, width = ROLLUP_GRAINS[grain]
+                    rollup_name = f"{table_name}_{grain}"
+                    rollup = self._qualified(rollup_name)
+                    cursor.execute(rollup_table_ddl(rollup, measures))
+                    existing = self._existing_columns(cursor, rollup_name)
+                    for col in measures:
+                        if col not in existing:
+                            cursor.execute(f"ALTER TABLE {rollup} ADD COLUMN `{col}` DOUBLE")
+
+                    selected = ", ".join(
+                        f"{aggregates.get(col, default_aggregate)}(`{col}`)" for col in measures)
+                    updates = ", ".join(f"`{col}` = VALUES(`{col}`)" for col in ["points"] + measures)
+                    cursor.execute(
+                        f"INSERT INTO {rollup} (`bucket`, `points`{''.join(f', `{col}`' for col in measures)}) "
+                        f"SELECT {bucket_expression.format(column=time_column)} AS bucket, COUNT(*)"
+                        f"{', ' + selected if selected else ''} "
+                        f"FROM {self._qualified(table_name)} "
+                        f"WHERE `{time_column}` >= %s AND `{time_column}` < %s GROUP BY bucket "
+                        f"ON DUPLICATE KEY UPDATE {updates}",
+                        (bucket_start(start, grain), bucket_start(end, grain) + width)
+                    )
+            connection.commit()
+
+    def partition_table(self, table_name: str, column: str, period_days: int = 1,
+                        retention_days: int = 0, ahead_days: int = 7):
+        """
+        Create table_name RANGE partitioned on a DATETIME column, one partition per period.
+
+        Args:
+            table_name (str): The table, which is partitioned when this writer creates it.
+            column (str): Time column to partition on. It joins the primary and natural keys.
+            period_days (int): Days per partition, e.g. 1 for daily or 7 for weekly partitions.
+            retention_days (int): Rows older than this many days are removed by
+                maintain_partitions(); 0 keeps everything.
+            ahead_days (int): How far ahead maintain_partitions() pre-creates partitions.
+        """
+        self.partitioning[table_name] = {"column": column, "period_days": period_days,
+                                         "retention_days": retention_days, "ahead_days": ahead_days}
+
+    def _wanted_partitions(self, spec: Dict, after: Optional[datetime.date] = None) -> List[datetime.date]:
+        # Period starts from the retention horizon, or just after the last existing partition, to ahead_days from now
+        today = datetime.datetime.now(datetime.timezone.utc).date()
+        period = datetime.timedelta(days=spec["period_days"])
+        start = partition_start(today - datetime.timedelta(days=spec["retention_days"]), spec["period_days"])
+        if after is not None:
+            # After a long pause, periods already past retention are not created just to be dropped
+            start = max(start, after + period) if spec["retention_days"] else after + period
+        last = partition_start(today + datetime.timedelta(days=spec["ahead_days"]), spec["period_days"])
+        starts = []
+        while start <= last:
+            starts.append(start)
+            start += period
+        return starts
+
+    def maintain_partitions(self, table_name: str, delete_chunk_size: int = 10000) -> int:
+        """
+        Pre-create the partitions for the next ahead_days and drop those entirely older than
+        retention_days. Dropping a partition is a metadata operation, however many rows it holds.
+
+        Tables created before they were registered with partition_table() are not partitioned;
+        their old rows are deleted in chunks of delete_chunk_size instead, each chunk in its own
+        transaction so no single DELETE holds locks for long.
+
+        Returns:
+            int: The number of partitions dropped, or of rows deleted for an unpartitioned table.
+        """
+        spec = self.partitioning[table_name]
+        table = self._qualified(table_name)
+        cutoff = datetime.datetime.now(datetime.timezone.utc).date() - datetime.timedelta(days=spec["retention_days"])
+        with self.pool.connection() as connection:
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    "SELECT PARTITION_NAME FROM information_schema.PARTITIONS WHERE TABLE_SCHEMA = %s AND TABLE_NAME = %s",
+                    (self.database, table_name)
+                )
+                names = [row[0] for row in cursor.fetchall()]
+                if not names:
+                    return 0  # Not created yet
+
+                if names == [None]:
+                    if not spec["retention_days"] or spec["column"] not in self._existing_columns(cursor, table_name):
+                        return 0
+                    deleted = 0
+                    while True:
+                        cursor.execute(f"DELETE FROM {table} WHERE `{spec['column']}` < %s LIMIT {delete_chunk_size}",
+                                       (cutoff,))
+                        connection.commit()
+                        deleted += cursor.rowcount
+                        if cursor.rowcount < delete_chunk_size:
+                            break
+                    if deleted:
+                        print(f" {deleted} rows older than {cutoff} deleted from {table_name}.")
+                    return deleted
+
+                starts = sorted(start for start in map(parse_partition_name, names) if start)
+                upcoming = self._wanted_partitions(spec, after=starts[-1] if starts else None)
+                if upcoming and FUTURE_PARTITION in names:
+                    # p_future only holds rows dated past the last partition, so splitting it moves little or nothing
+                    cursor.execute(f"ALTER TABLE {table} REORGANIZE PARTITION `{FUTURE_PARTITION}` INTO "
+                                   f"({', '.join(partition_definitions(upcoming, spec['period_days']))})")
+
+                period = datetime.timedelta(days=spec["period_days"])
+                expired = [start for start in starts if spec["retention_days"] and start + period <= cutoff]
+                if expired:
+                    cursor.execute(f"ALTER TABLE {table} DROP PARTITION "
+                                   + ", ".join(f"`{partition_name(start)}`" for start in expired))
+                    print(f" {len(expired)} partitions older than {cutoff} dropped from {table_name}.")
+            connection.commit()
+        return len(expired)
+
+    def rows_per_second(self, table_name: Optional[str] = None) -> float:
+        """
+        Average write throughput since the writer was created, for one table or all of them.
+        """
+        with self._stats_lock:
+            selected = [self.stats.get(table_name)] if table_name else list(self.stats.values())
+            rows = sum(s["rows"] for s in selected if s)
+            seconds = sum(s["seconds"] for s in selected if s)
+        return rows / seconds if seconds > 0 else 0.0
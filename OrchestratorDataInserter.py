@@ -1,261 +1,432 @@
-import pandas as pd
-from OrchestratorTenantClient import OrchestratorTenantClient
-from utils import write_df_to_mysql, now
+from OrchestratorTenantClient import OrchestratorTenantClient, QUEUE_RECORD_TIME_FIELD
+from MySQLWriter import MySQLConnectionPool, MySQLWriter
+from SpoolingWriter import SpoolingWriter
+from ParquetArchive import ParquetArchive
+from MySQLSchema import converter_for
+from RecordBatch import RecordBatch
+from StateStore import StateStore
+from TenantHealth import HEALTH_SOURCES, TenantHealth, overview_values
+from pipeline import stage
+from typing import Callable, Dict, Iterable, List, Optional
+from metrics import DEDUP_SKIPPED, DEDUP_WRITTEN, ERRORS, NORMALIZE_SECONDS
+import datetime
 import pymysql
+import uuid
+
+# Timestamp of a timeline point, its natural key and the column its rollups are bucketed on
+TIMELINE_TIME_FIELD = "pointInTime"
+
+# Rollup aggregates that differ from SUM, per timeline table and column
+TIMELINE_AGGREGATES = {
+    # Running jobs is a level, not a count of events, so summing points would overstate it
+    "completed_jobs_timeframe": {"countExecuting": "MAX"},
+}
+
+# Append-only history tables and the time column each is partitioned and expired on
+HISTORY_TABLES = {
+    "faulted_jobs": "CreationTime",
+    "queue_processing_records": QUEUE_RECORD_TIME_FIELD,
+    "transactions_timeline": TIMELINE_TIME_FIELD,
+    "completed_jobs_timeline": TIMELINE_TIME_FIELD,
+    "completed_jobs_timeframe": TIMELINE_TIME_FIELD,
+}
+
+# Every table the collector appends to rather than replaces: the history tables plus the overview histories
+APPEND_TABLES = dict(HISTORY_TABLES, transactions_overview="date_queried", completed_jobs_overview="date_queried")
 
 class OrchestratorDataInserter:
-    def __init__(self, client: OrchestratorTenantClient, db_user: str, db_pass: str, db_host: str, db_name: str):
+    def __init__(self, client: OrchestratorTenantClient, db_user: str, db_pass: str, db_host: str, db_name: str,
+                 pool: Optional[MySQLConnectionPool] = None, batch_size: int = 500,
+                 spool_dir: Optional[str] = None, spool_options: Optional[Dict] = None,
+                 health: Optional[TenantHealth] = None, tenant_name: Optional[str] = None,
+                 retention_days: Optional[Dict[str, int]] = None, partition_days: int = 1,
+                 archive_dir: Optional[str] = None, archive_after_days: int = 30, pipeline_depth: int = 2):
         self.client = client
         self.db_user = db_user
         self.db_pass = db_pass
         self.db_host = db_host
         self.db_name = db_name
+
+        # Share one pool across inserters where possible so every write reuses open connections
+        self.pool = pool or MySQLConnectionPool(host=db_host, user=db_user, password=db_pass)
+
+        # Per-tenant high-water marks and dedup hashes, persisted in this schema by the writer
+        # once the rows they describe are committed
+        self.state = StateStore(self.pool, db_name)
+
+        if spool_dir:
+            # Writes land in an on-disk spool first and a background flusher applies them,
+            # so a MySQL outage delays the data instead of losing it
+            self.writer = SpoolingWriter(self.pool, db_name, spool_dir, batch_size=batch_size,
+                                         state_store=self.state, **(spool_options or {}))
+            self.writer.start()
+        else:
+            self.writer = MySQLWriter(self.pool, db_name, batch_size=batch_size, state_store=self.state)
+        # History tables are partitioned by time so expiring old rows is a DROP PARTITION (see maintain_history_tables())
+        for table_name, column in HISTORY_TABLES.items():
+            self.writer.partition_table(table_name, column, period_days=partition_days,
+                                        retention_days=(retention_days or {}).get(table_name, 0))
+        # The writer also creates the schema before its first write, in case MySQL is down right now
         self.create_mysql_schema()
 
-    def create_mysql_schema(self):
-        # Create a connection to MySQL server
-        connection = pymysql.connect(
-            host=self.db_host,
-            user=self.db_user,
-            password=self.db_pass
-        )
+        # Pages a paged write may fetch and flatten ahead of the one being written
+        self.pipeline_depth = pipeline_depth
+
+        # Rows older than archive_after_days move from the append-only tables to Parquet files
+        self.archive = ParquetArchive(self.pool, db_name, archive_dir) if archive_dir else None
+        self.archive_after_days = archive_after_days
+
+        # Central cross-tenant health table, updated by each overview task with the counters it fetched
+        self.health = health
+        self.tenant_name = tenant_name or db_name
 
+    def create_mysql_schema(self):
         try:
-            with connection.cursor() as cursor:
-                # Check if the schema already exists
-                cursor.execute(f"CREATE DATABASE IF NOT EXISTS `{self.db_name}`;")
-                print(f"Schema '{self.db_name}' has been created or already exists.")
+            with self.pool.connection() as connection:
+                with connection.cursor() as cursor:
+                    # Check if the schema already exists
+                    cursor.execute(f"CREATE DATABASE IF NOT EXISTS `{self.db_name}`;")
+                    print(f"Schema '{self.db_name}' has been created or already exists.")
         except pymysql.MySQLError as e:
             print(f"Error creating schema: {e}")
-        finally:
-            connection.close()
+            ERRORS.inc(method="create_mysql_schema")
+
+    def _normalize(self, table_name: str, data) -> RecordBatch:
+        # Flattened the same way as pandas.json_normalize, without building a DataFrame
+        with NORMALIZE_SECONDS.time(schema=self.db_name, table=table_name):
+            return RecordBatch.from_records(data)
+
+    def _ingestion_metadata(self) -> Dict:
+        # One timestamp and run id per insert, shared by every page written by it
+        return {"date_queried": datetime.datetime.now(), "run_id": uuid.uuid4().hex}
+
+    def _stamp(self, batch: RecordBatch, metadata: Optional[Dict] = None) -> RecordBatch:
+        """
+        Ingestion-metadata stage: add date_queried and run_id to a batch, each as one constant column.
+        Empty batches are left empty so they still skip the write.
+        """
+        if batch.empty:
+            return batch
+        for name, value in (metadata or self._ingestion_metadata()).items():
+            batch.set_column(name, value)
+        return batch
+
+    def _write(self, batch: RecordBatch, table_name: str, dedup: bool = False, state: Optional[Dict] = None,
+               **kwargs) -> int:
+        """
+        Stamp a batch and write it. With dedup, the write is skipped when the payload hashes the
+        same as the last one written to the table (see _unchanged()).
+
+        state holds the collector state the write advances. It goes to the writer with the rows,
+        which saves it only once they are in MySQL; with a spool, that is after the flush.
+        """
+        state = dict(state or {})
+        if dedup:
+            content_hash = batch.content_hash()
+            if self._unchanged(table_name, content_hash):
+                return 0
+            state[f"{table_name}:content_hash"] = content_hash
+        return self.writer.write_batch(self._stamp(batch), table_name, state=state, **kwargs)
+
+    def _unchanged(self, table_name: str, content_hash: str) -> bool:
+        """
+        Dedup stage: compare a payload hash, taken before the ingestion metadata is added, with the
+        last hash written to the table. Hashes live in this tenant's StateStore, so the check is an
+        in-memory lookup and survives restarts.
+        """
+        if self.state.get(f"{table_name}:content_hash") == content_hash:
+            DEDUP_SKIPPED.inc(schema=self.db_name, table=table_name)
+            print(f" {table_name} unchanged, write skipped.")
+            return True
+        DEDUP_WRITTEN.inc(schema=self.db_name, table=table_name)
+        return False
+
+    def _write_pages(self, pages: Iterable[List[Dict]], table_name: str,
+                     transform: Callable[[List[Dict]], RecordBatch], **kwargs) -> int:
+        """
+        Write a paged API result as a fetch -> transform -> write pipeline (see pipeline.stage()):
+        the next pages are fetched and flattened on their own threads while the current one is
+        written, and each queue holds at most pipeline_depth pages so memory stays bounded.
+        """
+        metadata = self._ingestion_metadata()
+        labels = {"schema": self.db_name, "table": table_name}
+        fetched = stage(pages, depth=self.pipeline_depth, labels=dict(labels, stage="fetch"))
+        batches = stage(fetched, lambda records: self._stamp(transform(records), metadata),
+                        depth=self.pipeline_depth, labels=dict(labels, stage="transform"))
+        return self.writer.write_batch_pages(batches, table_name, **kwargs)
 
     def insert_queue_processing_records(self):
         try:
-            records = self.client.get_queue_processing_records(days=1)
-            record_dfs = [pd.json_normalize(record) for record in records]
-            
-            for record_df in record_dfs:
-                record_df.drop(columns=["ReportType", "QueueDefinitionId", "TenantId", "Id"], inplace=True)
-                write_df_to_mysql(record_df, "queue_processing_records", self.db_user, self.db_pass, self.db_host, self.db_name)
+            queue_ids = [str(queue["Id"]) for queue in self.client.queue_defs or []]
+            # Only watermarks whose rows are in MySQL; a spooled write may still be evicted
+            since = {queue_id: self.state.get(f"queue_processing_records:queue:{queue_id}", staged=False)
+                     for queue_id in queue_ids}
+            since = {queue_id: watermark for queue_id, watermark in since.items() if watermark}
+
+            records = self.client.get_queue_processing_records(days=1, since=since)
+            # One batched write for all queues instead of one connection per queue
+            batch = self._normalize("queue_processing_records", [row for record in records if record for row in record])
+            if batch.empty:
+                return 0
+            batch.drop(["ReportType", "TenantId", "Id"])
+            batch.map_column("QueueDefinitionId", str)
+
+            # Compared as times, not strings, so a different precision or offset cannot move a mark backwards
+            latest = batch.max_by("QueueDefinitionId", QUEUE_RECORD_TIME_FIELD, parse=converter_for("datetime"))
+            watermarks = {f"queue_processing_records:queue:{queue_id}": watermark
+                          for queue_id, watermark in latest.items()}
+
+            # Upsert on (queue, record time) so re-read buckets update in place rather than duplicate
+            return self._write(batch, "queue_processing_records",
+                               key_columns=["QueueDefinitionId", QUEUE_RECORD_TIME_FIELD], state=watermarks)
         except Exception as e:
             print(f"An error occurred in insert_queue_processing_records() : {str(e)}")
+            ERRORS.inc(method="insert_queue_processing_records")
 
     def insert_queue_details_table(self):
         try:
-            records = self.client.get_queue_details_table()
-            date_queried = now()
-            record_dfs_list = [pd.json_normalize(record).fillna("N/A") for record in records]
-            for record in records:
-                record["date_queried"] = date_queried
-                
-            record_dfs = pd.concat(record_dfs_list, axis=0)
-            write_df_to_mysql(record_dfs, "queue_details_table", self.db_user, self.db_pass, self.db_host, self.db_name, trunc=True)
+            pages = self.client.iter_queue_details_pages()
+            return self._write_pages(pages, "queue_details_table", trunc=True, missing_text="N/A",
+                                     transform=lambda records: self._normalize("queue_details_table", records))
         except Exception as e:
             print(f"An error occurred in insert_queue_details_table() : {str(e)}")
+            ERRORS.inc(method="insert_queue_details_table")
 
     def insert_unprocessed_items(self):
         try:
             record = self.client.get_unprocessed_items()
-            record["date_queried"] = now()
-            record_df = pd.json_normalize(record)
-            write_df_to_mysql(record_df, "unprocessed_items", self.db_user, self.db_pass, self.db_host, self.db_name, trunc=True)
+            batch = self._normalize("unprocessed_items", record)
+            return self._write(batch, "unprocessed_items", trunc=True, dedup=True)
         except Exception as e:
             print(f"An error occurred in insert_unprocessed_items() : {str(e)}")
+            ERRORS.inc(method="insert_unprocessed_items")
+
+    def _upsert_timeline(self, table_name: str, records) -> int:
+        """
+        Upsert timeline points on their timestamp, then refresh the hourly and daily rollups for
+        the buckets they fall in. Each run returns the last 24 hours, so points overlap the previous
+        run; an overlapping point updates its row instead of adding a duplicate.
+        """
+        batch = self._normalize(table_name, records)
+        if batch.empty:
+            return 0
+
+        written = self._write(batch, table_name, key_columns=[TIMELINE_TIME_FIELD])
+
+        to_datetime = converter_for("datetime")
+        points = [point for point in map(to_datetime, batch.column(TIMELINE_TIME_FIELD)) if point]
+        if points:
+            self.writer.refresh_rollups(table_name, TIMELINE_TIME_FIELD, min(points), max(points),
+                                        aggregates=TIMELINE_AGGREGATES.get(table_name))
+        return written
 
     def insert_transactions_timeline(self):
         try:
             records = self.client.get_transactions_timeline()
-            for record in records:
-                write_df_to_mysql(pd.json_normalize(record), "transactions_timeline", self.db_user, self.db_pass, self.db_host, self.db_name)
+            return self._upsert_timeline("transactions_timeline", records)
         except Exception as e:
             print(f"An error occurred in insert_transactions_timeline() : {str(e)}")
+            ERRORS.inc(method="insert_transactions_timeline")
+
+    def _append_if_changed(self, table_name: str, record: Dict, counted_columns: List[str]) -> int:
+        """
+        Append an overview snapshot to its history table only when its counters changed.
+
+        The last counters written are kept in the StateStore, which answers from memory after
+        the first read, so an unchanged snapshot is skipped without touching disk or MySQL, and
+        the comparison survives container restarts.
+
+        A record missing any of the counted columns is rejected rather than appended as a row
+        of NULL counters.
+        """
+        if not isinstance(record, dict):
+            raise ValueError(f"{table_name} response is not a counters object: {str(record)[:200]}")
+        missing = [column for column in counted_columns if record.get(column) is None]
+        if missing:
+            raise ValueError(f"{table_name} response lacks {', '.join(missing)}")
+        counters = {column: record[column] for column in counted_columns}
+        self._update_tenant_health(table_name, counters)
+        state_key = f"{table_name}:last_counters"
+        if self.state.get(state_key) == counters:
+            return 0
+
+        # Appended, never truncated: date_queried is indexed, so "latest row" queries stay cheap
+        return self._write(self._normalize(table_name, record), table_name, state={state_key: counters})
 
     def insert_transactions_overview(self):
         try:
             record = self.client.get_transactions_overview()
-            record["date_queried"] = now()
-
-            new_record_df = pd.json_normalize(record)
-
-            try:
-                old_record_df = pd.read_csv("transactions_overview_old.csv")
-
-                columns_to_sum = ["countSuccessful", "countBusinessExceptions", "countApplicationExceptions"]
-
-                old_total = old_record_df[columns_to_sum].sum(axis=1).values[0]
-                new_total = new_record_df[columns_to_sum].sum(axis=1).values[0]
-
-                if old_total == new_total:
-                    return
-                record_df = pd.concat([new_record_df, old_record_df])
-            except:
-                record_df = new_record_df
-                
-            write_df_to_mysql(record_df, "transactions_overview", self.db_user, self.db_pass, self.db_host, self.db_name,trunc=True)
-            
-            new_record_df.to_csv("transactions_overview_old.csv",index=False, mode="w")
-
+            return self._append_if_changed("transactions_overview", record,
+                                           list(HEALTH_SOURCES["transactions_overview"][1]))
         except Exception as e:
             print(f"An error occurred in insert_transactions_overview() : {str(e)}")
-
-
+            ERRORS.inc(method="insert_transactions_overview")
 
     def insert_completed_jobs_overview(self):
         try:
             record = self.client.get_completed_jobs_overview()
-            record["date_queried"] = now()
-            new_record_df = pd.json_normalize(record)
-
-            try:
-                old_record_df = pd.read_csv("jobs_overview_old.csv")
-
-                columns_to_sum = ["countSuccessful", "countErrors", "countStopped"]
-
-                old_total = old_record_df[columns_to_sum].sum(axis=1).values[0]
-                new_total = new_record_df[columns_to_sum].sum(axis=1).values[0]
-
-                if old_total == new_total:
-                    return
-                record_df = pd.concat([new_record_df, old_record_df])
-            except:
-                record_df = new_record_df
-                
-            write_df_to_mysql(record_df, "completed_jobs_overview", self.db_user, self.db_pass, self.db_host, self.db_name,trunc=True)
-            
-            new_record_df.to_csv("jobs_overview_old.csv",index=False, mode="w")
-
+            return self._append_if_changed("completed_jobs_overview", record,
+                                           list(HEALTH_SOURCES["completed_jobs_overview"][1]))
         except Exception as e:
             print(f"An error occurred in insert_completed_jobs_overview() : {str(e)}")
+            ERRORS.inc(method="insert_completed_jobs_overview")
 
 
     def insert_completed_jobs_timeline(self):
         try:
             records = self.client.get_completed_jobs_timeline()
-            for record in records:
-                write_df_to_mysql(pd.json_normalize(record), "completed_jobs_timeline", self.db_user, self.db_pass, self.db_host, self.db_name)
+            return self._upsert_timeline("completed_jobs_timeline", records)
         except Exception as e:
             print(f"An error occurred in insert_completed_jobs_timeline() : {str(e)}")
+            ERRORS.inc(method="insert_completed_jobs_timeline")
 
     def insert_completed_jobs_timeframe(self):
         try:
             records = self.client.get_completed_jobs_timeframe()
-            for record in records:
-                write_df_to_mysql(pd.json_normalize(record), "completed_jobs_timeframe", self.db_user, self.db_pass, self.db_host, self.db_name)
+            return self._upsert_timeline("completed_jobs_timeframe", records)
         except Exception as e:
             print(f"An error occurred in insert_completed_jobs_timeframe() : {str(e)}")
+            ERRORS.inc(method="insert_completed_jobs_timeframe")
 
     def insert_process_details_table(self):
         try:
-            records = self.client.get_process_details_table(time_frame_minutes=10080)
-            date_queried = now()
-            record_dfs_list = [pd.json_normalize(record).fillna("N/A") for record in records]
-            for record in records:
-                record["date_queried"] = date_queried
-                
-            record_dfs = pd.concat(record_dfs_list, axis=0)
-            write_df_to_mysql(record_dfs, "process_details_table", self.db_user, self.db_pass, self.db_host, self.db_name, trunc=True)
+            pages = self.client.iter_process_details_pages(time_frame_minutes=10080)
+            return self._write_pages(pages, "process_details_table", trunc=True, missing_text="N/A",
+                                     transform=lambda records: self._normalize("process_details_table", records))
         except Exception as e:
             print(f"An error occurred in insert_process_details_table() : {str(e)}")
+            ERRORS.inc(method="insert_process_details_table")
 
     def insert_job_stats(self):
         try:
             records = self.client.get_job_stats()
             new_record = {record["title"]: record["count"] for record in records}
-            new_record["date_queried"] = now()
-            record_df = pd.json_normalize(new_record)
-            write_df_to_mysql(record_df, "job_stats", self.db_user, self.db_pass, self.db_host, self.db_name, trunc=True)
+            batch = self._normalize("job_stats", new_record)
+            return self._write(batch, "job_stats", trunc=True, dedup=True)
         except Exception as e:
             print(f"An error occurred in insert_job_stats() : {str(e)}")
+            ERRORS.inc(method="insert_job_stats")
 
     
     def insert_triggered_job_states (self):
         try:
             record = self.client.get_triggered_job_states()
-            record["date_queried"] = now()
-            record_df = pd.json_normalize(record)
-            write_df_to_mysql(record_df,
-                            "triggered_job_states",
-                            self.db_user,
-                            self.db_pass,
-                            self.db_host,
-                            self.db_name,
-                            trunc=True)
+            batch = self._normalize("triggered_job_states", record)
+            return self._write(batch, "triggered_job_states", trunc=True, dedup=True)
 
         except Exception as e:
             print(f"An error occured in insert_triggered_job_states() : {str(e)}")
+            ERRORS.inc(method="insert_triggered_job_states")
 
 
     def insert_queue_data(self):
         try:
 
             queue_data = self.client.get_queue_data()
+            if queue_data is None:
+                # A folder could not be read; an empty or partial list must not replace the table
+                return None
                 
-            record_dfs = pd.json_normalize(queue_data)
+            batch = self._normalize("queue_data", queue_data)
 
 
 
-            # Write the DataFrame to the MySQL database
-            write_df_to_mysql(record_dfs,
-                "queue_data",  # Table name where queue data will be inserted
-                self.db_user,
-                self.db_pass,
-                self.db_host,
-                self.db_name,
-                trunc=True)  # Set to True if you want to truncate the table before inserting
+            # Write the records to the MySQL database
+            return self._write(batch, "queue_data", trunc=True, dedup=True)
 
         except Exception as e:
             print(f"An error occurred in insert_queue_data(): {str(e)}")
+            ERRORS.inc(method="insert_queue_data")
 
     def insert_maintenance_mode_status(self):
         try:
             # Get maintenance mode status from the client
 
-            current_machine_df = pd.json_normalize(self.client.get_maintenance_mode_status())
+            current_machines = self._normalize("maintenance_mode_states", self.client.get_maintenance_mode_status())
 
-            write_df_to_mysql(current_machine_df,
-                "maintenance_mode_states",
-                self.db_user,
-                self.db_pass,
-                self.db_host,
-                self.db_name,
-                trunc=True)
+            return self._write(current_machines, "maintenance_mode_states", trunc=True, dedup=True)
             
         except Exception as e:
             print(f"An error occured in insert_maintenance_mode_status() : {str(e)}")
+            ERRORS.inc(method="insert_maintenance_mode_status")
 
 
     def insert_disabled_triggers(self):
         try:
 
-            # Retrieve schedules from the client and normalize them into a DataFrame
-            record_dfs = pd.json_normalize(self.client.get_disabled_triggers())
-
-            # Write the DataFrame to the database table
-            write_df_to_mysql(record_dfs,
-                            "disabled_triggers",  # Replace with your table name
-                            self.db_user,
-                            self.db_pass,
-                            self.db_host,
-                            self.db_name,
-                            trunc=True)  # Optional: set trunc=True if you want to truncate the table before insert
+            # Retrieve schedules from the client and flatten them into columns
+            schedules = self.client.get_disabled_triggers()
+            if schedules is None:
+                # A folder could not be read; an empty or partial list must not replace the table
+                return None
+            batch = self._normalize("disabled_triggers", schedules)
+
+            # Write the records to the database table
+            return self._write(batch, "disabled_triggers", trunc=True, dedup=True)
             
         except Exception as e:
             print(f"An error occurred in insert_disabled_triggers(): {str(e)}")
+            ERRORS.inc(method="insert_disabled_triggers")
 
 
     def insert_faulted_jobs (self):
         
         try:
-            record_df = pd.json_normalize(self.client.get_faulted_jobs())
-
-            write_df_to_mysql(record_df,
-                    "faulted_jobs",
-                    self.db_user,
-                    self.db_pass,
-                    self.db_host,
-                    self.db_name,
-                    trunc=False)
+            folder_ids = [str(folder["Id"]) for folder in self.client.folders or []]
+            since = {folder_id: self.state.get(f"faulted_jobs:ended:folder:{folder_id}", staged=False)
+                     for folder_id in folder_ids}
+            since = {folder_id: watermark for folder_id, watermark in since.items() if watermark}
+
+            batch = self._normalize("faulted_jobs", self.client.get_faulted_jobs(since=since))
+            if batch.empty:
+                return 0
+
+            # Folders whose sweep failed have no rows in the batch, so their watermark is not advanced
+            latest = batch.max_by("FolderId", "Ended", parse=converter_for("datetime"))
+            watermarks = {f"faulted_jobs:ended:folder:{folder_id}": watermark
+                          for folder_id, watermark in latest.items()}
+
+            # Upsert on the job Key so a fault is stored once however often it is seen
+            return self._write(batch, "faulted_jobs", key_columns=["Key"], state=watermarks)
             
         except Exception as e:
-            print(f"An error occured in insert_faulted_jobs() : {str(e)}")
\ No newline at end of file
+            print(f"An error occured in insert_faulted_jobs() : {str(e)}")
+            ERRORS.inc(method="insert_faulted_jobs")
+
+    def maintain_history_tables(self):
+        """
+        Pre-create upcoming partitions of the history tables and drop the ones past retention.
+        """
+        try:
+            return sum(self.writer.maintain_partitions(table_name) for table_name in HISTORY_TABLES)
+        except Exception as e:
+            print(f"An error occurred in maintain_history_tables() : {str(e)}")
+            ERRORS.inc(method="maintain_history_tables")
+
+    def archive_history_tables(self):
+        """
+        Move rows older than archive_after_days from the append-only tables to the Parquet archive.
+        """
+        if self.archive is None:
+            return 0
+        try:
+            return self.archive.archive_tables(APPEND_TABLES, self.archive_after_days)
+        except Exception as e:
+            print(f"An error occurred in archive_history_tables() : {str(e)}")
+            ERRORS.inc(method="archive_history_tables")
+
+    def _update_tenant_health(self, table_name: str, counters: Dict):
+        """
+        Publish one overview's counters to this tenant's row in the central tenant_health_latest
+        table, from the task that fetched them. Only that overview's columns are written, so the
+        two overview tasks never wait for or overwrite each other. Unchanged counters are still
+        published, which keeps updated_at fresh for the staleness alert.
+        """
+        if self.health is None:
+            return
+        try:
+            self.health.update(self.db_name, self.tenant_name,
+                               overview_values(table_name, counters, datetime.datetime.now()))
+        except Exception as e:
+            print(f"An error occurred in _update_tenant_health() : {str(e)}")
+            ERRORS.inc(method="update_tenant_health")
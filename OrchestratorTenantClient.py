@@ -1,6 +1,43 @@
-from typing import List, Dict, Optional
+from typing import Callable, Iterator, List, Dict, Optional, TypeVar
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from email.utils import parsedate_to_datetime
+from http.cookiejar import DefaultCookiePolicy
+from urllib.parse import urljoin
+from requests.adapters import HTTPAdapter
+from metrics import ERRORS, HTTP_REQUEST_SECONDS, HTTP_RETRIES
 import requests
 import datetime
+import math
+import random
+import re
+import threading
+import time
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+# Responses worth retrying for idempotent GETs
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+# Timestamp of a queue processing record, used as its watermark and natural key
+QUEUE_RECORD_TIME_FIELD = "ProcessingTime"
+
+# Upper bound on daysNo when catching up on queue processing records after downtime
+MAX_BACKFILL_DAYS = 7
+
+# Job fields read by get_faulted_jobs(), requested with $select to keep the payload small
+FAULTED_JOB_FIELDS = ["Key", "ReleaseName", "OrganizationUnitFullyQualifiedName", "HostMachineName",
+                      "StartTime", "EndTime", "CreationTime", "Info"]
+
+def parse_odata_time(value: str) -> datetime.datetime:
+    """
+    Parse an Orchestrator ISO 8601 timestamp such as 2024-05-01T10:00:00.123Z into an aware datetime.
+    """
+    parsed = datetime.datetime.fromisoformat(value.replace("Z", "+00:00"))
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=datetime.timezone.utc)
+    return parsed
 
 class OrchestratorTenantClient:
     """
@@ -8,19 +45,100 @@ class OrchestratorTenantClient:
     This does not allow for manipulating any data in Orchestrator.
     """
     ### Private Functions Start ###
-    def __init__(self, organisation: str, tenant: str, client_id: str, refresh_token: str):
+    def __init__(
+        self,
+        organisation: str,
+        tenant: str,
+        client_id: str,
+        refresh_token: str,
+        max_in_flight: int = 8,
+        base_url: Optional[str] = None,
+        auth_url: str = "https://account.uipath.com/oauth/token",
+        session: Optional[requests.Session] = None,
+        max_retries: int = 4,
+        backoff_factor: float = 0.5,
+        max_backoff: float = 30.0,
+        request_timeout: float = 60.0,
+        token_refresh_margin: float = 300.0,
+        metadata_ttl: float = 3600.0,
+        fault_reason_cache_size: int = 10000
+    ):
+        """
+        :param max_in_flight: Upper bound on concurrent requests made by this client, including when fanning
+            out over folders or queues. Set to 1 to make the per-folder and per-queue calls strictly sequential.
+        :param base_url: Override the Orchestrator URL, e.g. to point the client at a local mock server.
+        :param auth_url: Override the token endpoint.
+        :param session: A requests.Session to reuse, e.g. one shared by all tenants (see build_session());
+            by default the client builds its own keep-alive pool sized to max_in_flight.
+        :param max_retries: How many times a GET is retried on connection errors, 429 and 5xx responses.
+        :param backoff_factor: Base delay in seconds for exponential backoff with full jitter.
+        :param max_backoff: Cap on a single backoff delay, including delays requested through Retry-After.
+        :param request_timeout: Per-request timeout in seconds.
+        :param token_refresh_margin: Refresh the access token this many seconds before it expires.
+        :param metadata_ttl: How long folder and queue definition lists are cached, in seconds.
+        :param fault_reason_cache_size: Number of fault reasons kept in the LRU cache keyed by job Key.
+        """
         self.organisation = organisation
         self.tenant = tenant
         self.client_id = client_id
         self.refresh_token = refresh_token
-        self.base_url = f"https://cloud.uipath.com/{organisation}/{tenant}/orchestrator_/"
-        self.access_token = self._authenticate()
-
-        self.folders = self._get_folders()
-        self.queue_defs = self._get_queue_defs()
+        self.max_in_flight = max(1, max_in_flight)
+        self.base_url = base_url or f"https://cloud.uipath.com/{organisation}/{tenant}/orchestrator_/"
+        self.auth_url = auth_url
+        self.max_retries = max_retries
+        self.backoff_factor = backoff_factor
+        self.max_backoff = max_backoff
+        self.request_timeout = request_timeout
+        self.session = session or self.build_session(self.max_in_flight)
+        # Caps concurrent requests for this tenant even when several tasks use the client at once
+        self._in_flight = threading.BoundedSemaphore(self.max_in_flight)
+
+        # Per-endpoint request counts, retries and latency, see get_endpoint_stats()
+        self.endpoint_stats: Dict[str, Dict[str, float]] = {}
+        self._stats_lock = threading.Lock()
+
+        self.token_refresh_margin = token_refresh_margin
+        self.metadata_ttl = metadata_ttl
+        self.token_expires_at = 0.0
+        self._auth_lock = threading.Lock()
+        self._metadata: Dict[str, tuple] = {}
+        self._metadata_lock = threading.Lock()
+        self.fault_reason_cache_size = fault_reason_cache_size
+        self._fault_reasons: "OrderedDict[str, str]" = OrderedDict()
+        self._fault_reason_lock = threading.Lock()
+
+        # Nothing is fetched here: the token is obtained by the first request, and folders and
+        # queue definitions by the first method that reads them, so a run only pays for what it uses
+        self.access_token: Optional[str] = None
+
+    @property
+    def folders(self) -> Optional[List[Dict]]:
+        # Loaded on first access and cached for metadata_ttl seconds
+        return self._cached_metadata("folders", self._get_folders)
+
+    @property
+    def queue_defs(self) -> Optional[List[Dict]]:
+        return self._cached_metadata("queue_defs", self._get_queue_defs)
+
+    def _cached_metadata(self, name: str, loader: Callable[[], Optional[List[Dict]]]) -> Optional[List[Dict]]:
+        with self._metadata_lock:
+            value, loaded_at = self._metadata.get(name, (None, 0.0))
+            if value is None or time.monotonic() - loaded_at >= self.metadata_ttl:
+                fresh = loader()
+                # Keep serving the previous list if a refresh fails
+                if fresh is not None:
+                    value = fresh
+                    self._metadata[name] = (fresh, time.monotonic())
+            return value
+
+    def invalidate_metadata(self):
+        """
+        Drop cached folders and queue definitions so the next access refetches them.
+        """
+        with self._metadata_lock:
+            self._metadata.clear()
 
     def _authenticate(self) -> Optional[str]:
-        auth_url = "https://account.uipath.com/oauth/token"
         headers = {
             "Content-Type": "application/json",
             "X-UIPATH-TenantName": self.tenant
@@ -32,29 +150,233 @@ class OrchestratorTenantClient:
             "refresh_token": self.refresh_token
         }
 
-        response = requests.post(auth_url, headers=headers, json=body)
+        response = self.session.post(self.auth_url, headers=headers, json=body, timeout=self.request_timeout)
         if response.status_code == 200:
             data = response.json()
+            self.token_expires_at = time.monotonic() + float(data.get("expires_in", 3600))
+            # The token endpoint may rotate the refresh token
+            if data.get("refresh_token"):
+                self.refresh_token = data["refresh_token"]
             return data.get("access_token")
         print(f"Failed to Authenticate: {response.text}")
+        ERRORS.inc(method="_authenticate")
         return None
-        
+
+    def _refresh_access_token(self, stale_token: Optional[str]):
+        """
+        Re-authenticate once, even when several threads notice a missing or expired token at the
+        same time: nothing is done if another thread has already replaced stale_token.
+        """
+        with self._auth_lock:
+            if self.access_token != stale_token:
+                return
+            token = self._authenticate()
+            if token is not None:
+                self.access_token = token
+
+    def _ensure_token(self):
+        if self.access_token is None or time.monotonic() >= self.token_expires_at - self.token_refresh_margin:
+            self._refresh_access_token(self.access_token)
 
     def _get_headers(self) -> Dict[str, str]:
+        self._ensure_token()
         return {
             'Authorization': f'Bearer {self.access_token}',
             'Content-Type': 'application/json'
         }
     
+    @staticmethod
+    def build_session(pool_size: int) -> requests.Session:
+        """
+        Keep-alive session with room for pool_size concurrent connections per host.
+        Cookies are not kept, so one session can safely be shared by clients of different tenants.
+        """
+        session = requests.Session()
+        session.cookies.set_policy(DefaultCookiePolicy(allowed_domains=[]))
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=max(pool_size, 10))
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        return session
+
+    def _endpoint(self, url: str) -> str:
+        # Collapse ids and query strings so stats group by endpoint rather than by URL
+        path = url[len(self.base_url):] if url.startswith(self.base_url) else url
+        path = path.split("?", 1)[0]
+        return re.sub(r"\([^)]*\)", "()", path)
+
+    def _record_request(self, endpoint: str, seconds: float, status, retried: bool = False, failed: bool = False):
+        HTTP_REQUEST_SECONDS.observe(seconds, tenant=self.organisation, endpoint=endpoint, status=status)
+        if retried:
+            HTTP_RETRIES.inc(tenant=self.organisation, endpoint=endpoint)
+        with self._stats_lock:
+            stats = self.endpoint_stats.setdefault(
+                endpoint, {"requests": 0, "retries": 0, "errors": 0, "total_seconds": 0.0, "max_seconds": 0.0})
+            stats["requests"] += 1
+            stats["total_seconds"] += seconds
+            stats["max_seconds"] = max(stats["max_seconds"], seconds)
+            if retried:
+                stats["retries"] += 1
+            if failed:
+                stats["errors"] += 1
+
+    def _retry_delay(self, attempt: int, response: Optional[requests.Response]) -> float:
+        if response is not None and response.status_code in (429, 503):
+            retry_after = response.headers.get("Retry-After")
+            if retry_after:
+                try:
+                    return min(self.max_backoff, max(0.0, float(retry_after)))
+                except ValueError:
+                    try:
+                        retry_at = parsedate_to_datetime(retry_after)
+                        wait = (retry_at - datetime.datetime.now(retry_at.tzinfo)).total_seconds()
+                        return min(self.max_backoff, max(0.0, wait))
+                    except (TypeError, ValueError):
+                        pass
+        # Exponential backoff with full jitter
+        return random.uniform(0, min(self.max_backoff, self.backoff_factor * (2 ** attempt)))
+
+    def _get(self, url: str, headers: Dict[str, str]) -> requests.Response:
+        """
+        GET through the pooled session, retrying connection errors, 429 and 5xx responses
+        with exponential backoff. Retry-After is honoured on 429 and 503. A 401 triggers one
+        re-authentication and a replay with the new token. The last response is returned once
+        retries are exhausted so callers keep their existing error handling.
+        """
+        endpoint = self._endpoint(url)
+        attempt = 0
+        reauthenticated = False
+        while True:
+            started = time.perf_counter()
+            error = None
+            response = None
+            try:
+                with self._in_flight:
+                    response = self.session.get(url, headers=headers, timeout=self.request_timeout)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                error = e
+            if response is not None and response.status_code == 401 and not reauthenticated:
+                self._record_request(endpoint, time.perf_counter() - started, 401, retried=True)
+                reauthenticated = True
+                self._refresh_access_token(headers.get("Authorization", "")[len("Bearer "):])
+                headers = dict(headers, Authorization=f"Bearer {self.access_token}")
+                continue
+
+            retryable = error is not None or response.status_code in RETRY_STATUSES
+            will_retry = retryable and attempt < self.max_retries
+            status = response.status_code if response is not None else "error"
+            self._record_request(endpoint, time.perf_counter() - started, status, retried=will_retry,
+                                 failed=retryable and not will_retry)
+
+            if not will_retry:
+                if error is not None:
+                    raise error
+                return response
+
+            time.sleep(self._retry_delay(attempt, response))
+            attempt += 1
+
+    def get_endpoint_stats(self) -> Dict[str, Dict[str, float]]:
+        """
+        Snapshot of per-endpoint counters: requests, retries, errors, total_seconds, max_seconds and avg_seconds.
+        """
+        with self._stats_lock:
+            snapshot = {endpoint: dict(stats) for endpoint, stats in self.endpoint_stats.items()}
+        for stats in snapshot.values():
+            stats["avg_seconds"] = stats["total_seconds"] / stats["requests"] if stats["requests"] else 0.0
+        return snapshot
+
+    def iter_odata_pages(self, url: str, headers: Optional[Dict[str, str]] = None,
+                         page_size: int = 100) -> Iterator[List[Dict]]:
+        """
+        Lazily yield the "value" list of each page of an OData collection.
+
+        Follows @odata.nextLink when the server returns one and falls back to $top/$skip otherwise,
+        so results are never capped at a single page. Pages are requested only as the caller
+        consumes them, so a consumer that writes each page before asking for the next holds
+        at most one page in memory. An error response raises requests.HTTPError.
+
+        :param url: Collection URL, with or without its own query string (but without $top/$skip).
+        :param headers: Request headers, defaults to the tenant headers without a folder.
+        :param page_size: Number of entities requested per page.
+        """
+        headers = headers or self._get_headers()
+        separator = "&" if "?" in url else "?"
+        skip = 0
+        next_url = f"{url}{separator}$top={page_size}&$skip={skip}"
+        while next_url:
+            response = self._get(next_url, headers)
+            # An error page is not an empty page: raising aborts the write instead of truncating the table
+            response.raise_for_status()
+            data = response.json()
+            page = data["value"]
+            if page:
+                yield page
+
+            next_link = data.get("@odata.nextLink")
+            if next_link:
+                next_url = urljoin(next_url, next_link)
+            elif len(page) >= page_size:
+                skip += page_size
+                next_url = f"{url}{separator}$top={page_size}&$skip={skip}"
+            else:
+                next_url = None
+
+    def iter_monitoring_pages(self, url: str, headers: Optional[Dict[str, str]] = None,
+                              page_size: int = 1000) -> Iterator[List[Dict]]:
+        """
+        Lazily yield the "data" list of each page of a monitoring API table (pageNo/pageSize paging).
+
+        Stops at the first short page, or once totalCount rows have been read when the API reports it.
+        An error response (once _get() has run out of retries) raises rather than ending the table early.
+
+        :param url: Table URL, with or without its own query string (but without pageNo/pageSize).
+        :param headers: Request headers, defaults to the tenant headers without a folder.
+        :param page_size: Number of rows requested per page.
+        """
+        headers = headers or self._get_headers()
+        separator = "&" if "?" in url else "?"
+        page_no = 1
+        seen = 0
+        while True:
+            response = self._get(f"{url}{separator}pageNo={page_no}&pageSize={page_size}", headers)
+            response.raise_for_status()
+            data = response.json()
+            page = data["data"] or []
+            if page:
+                yield page
+
+            seen += len(page)
+            total = data.get("totalCount")
+            if len(page) < page_size or (total is not None and seen >= int(total)):
+                return
+            page_no += 1
+
+    def _fan_out(self, func: Callable[[T], R], items: List[T]) -> List[R]:
+        """
+        Apply func to every item with at most max_in_flight calls running at once.
+        Results are returned in the same order as items, so callers see the same
+        output as a sequential loop. Exceptions raised by func propagate.
+        """
+        if self.max_in_flight == 1 or len(items) <= 1:
+            return [func(item) for item in items]
+        with ThreadPoolExecutor(max_workers=min(self.max_in_flight, len(items))) as executor:
+            return list(executor.map(func, items))
+
+    def _folder_headers(self, folder_id) -> Dict[str, str]:
+        headers = self._get_headers()
+        headers["X-UIPATH-OrganizationUnitId"] = str(folder_id)
+        return headers
+
     def _get_queue_defs(self) -> Optional[List[Dict]]:
         try:
             request_url = self.base_url + f"odata/QueueDefinitions"
             headers = self._get_headers()
-            response = requests.get(request_url, headers=headers)
+            response = self._get(request_url, headers)
             data = response.json()["value"]
             return data
         except Exception as e:
             print("An error occurred in _get_queue_defs():", str(e))
+            ERRORS.inc(method="_get_queue_defs")
             return None
         
 
@@ -62,62 +384,104 @@ class OrchestratorTenantClient:
         try:
             request_url = self.base_url + f"odata/Folders"
             headers = self._get_headers()
-            response = requests.get(request_url, headers=headers)
+            response = self._get(request_url, headers)
             data = response.json()["value"]
             return data
         except Exception as e:
             print("An error occurred in _get_folders():", str(e))
+            ERRORS.inc(method="_get_folders")
             return None
     ### Private Functions End ###
 
 
     ### Queue Functions Start ###
+    def iter_queue_details_pages(
+        self,
+        time_frame_minutes: int = 1440,
+        pageSize: int = 1000,
+        orderBy: str = "queueName",
+        direction: str = "asc"
+    ) -> Iterator[List[Dict]]:
+        """
+        Lazily yield every page of queue details from Orchestrator. Errors propagate to the consumer.
+
+        :param time_frame_minutes: The timeframe in minutes to fetch the queue data (default is 1440 or 24 hours).
+        :param pageSize: The number of items per page (default is 1000).
+        :param orderBy: The field to order the data by (default is 'queueName').
+        :param direction: The order direction, either 'asc' or 'desc' (default is 'asc').
+        """
+        request_url = self.base_url + f"monitoring/QueuesMonitoring/GetQueuesTable?timeFrameMinutes={time_frame_minutes}&orderBy={orderBy}&direction={direction}"
+        return self.iter_monitoring_pages(request_url, page_size=pageSize)
+
     def get_queue_details_table(
         self, 
         time_frame_minutes: int = 1440, 
-        pageNo: int = 1, 
         pageSize: int = 1000, 
         orderBy: str = "queueName", 
         direction: str = "asc"
     ) -> Optional[List[Dict]]:
         """
-        Fetch queue details from Orchestrator.
+        Fetch all queue details from Orchestrator, following every page.
 
         :param time_frame_minutes: The timeframe in minutes to fetch the queue data (default is 1440 or 24 hours).
-        :param pageNo: The page number for pagination (default is 1).
         :param pageSize: The number of items per page (default is 1000).
         :param orderBy: The field to order the data by (default is 'queueName').
         :param direction: The order direction, either 'asc' or 'desc' (default is 'asc').
         :return: A list of dictionaries with the queue details or None if an error occurs.
         """
         try:
-            request_url = self.base_url + f"monitoring/QueuesMonitoring/GetQueuesTable?timeFrameMinutes={time_frame_minutes}&pageNo={pageNo}&pageSize={pageSize}&orderBy={orderBy}&direction={direction}"
-            headers = self._get_headers()
-            response = requests.get(request_url, headers=headers)
-            data = response.json()["data"]
+            data = []
+            for page in self.iter_queue_details_pages(time_frame_minutes, pageSize, orderBy, direction):
+                data.extend(page)
             return data
         except Exception as e:
             print("An error occurred in get_queue_details_table():", str(e))
+            ERRORS.inc(method="get_queue_details_table")
             return None
 
 
-    def get_queue_processing_records(self, days: int = 1) -> Optional[List[List[Dict]]]:
+    def get_queue_processing_records(
+        self,
+        days: int = 1,
+        since: Optional[Dict[str, str]] = None
+    ) -> Optional[List[List[Dict]]]:
+        """
+        Fetch processing records for every queue definition.
+
+        :param days: How many days of records to request for a queue with no watermark.
+        :param since: Optional map of queue definition Id (as str) to the latest record time already stored.
+            Only records at or after that time are returned (the latest bucket is re-read so it can be
+            updated in place), and only as many days as needed to cover the gap are requested.
+        :return: One list of records per queue, or None if an error occurs.
+        """
+        since = since or {}
+        current_time = datetime.datetime.now(datetime.timezone.utc)
+
+        def fetch(queue: Dict) -> List[Dict]:
+            watermark = since.get(str(queue["Id"]))
+            days_no = days
+            if watermark:
+                gap = current_time - parse_odata_time(watermark)
+                days_no = min(max(1, math.ceil(gap.total_seconds() / 86400)), MAX_BACKFILL_DAYS)
+
+            request_url = self.base_url + f"odata/QueueProcessingRecords/UiPathODataSvc.RetrieveLastDaysProcessingRecords(daysNo={days_no},queueDefinitionId={queue['Id']})"
+            headers = self._get_headers()
+            response = self._get(request_url, headers)
+            records = response.json()["value"]
+            if watermark:
+                records = [record for record in records
+                           if parse_odata_time(record[QUEUE_RECORD_TIME_FIELD]) >= parse_odata_time(watermark)]
+
+            # insert the name of the queue into the response for downstream filtering
+            for record in records:
+                record["Name"] = queue["Name"]
+            return records
+
         try:
-            datalist = []
-            for queue in self.queue_defs:
-                request_url = self.base_url + f"odata/QueueProcessingRecords/UiPathODataSvc.RetrieveLastDaysProcessingRecords(daysNo={1},queueDefinitionId={queue['Id']})"
-                headers = self._get_headers()
-                response = requests.get(request_url, headers=headers)
-                records = response.json()["value"]
-
-                # insert the name of the queue into the response for downstream filtering
-                for record in records:
-                    record["Name"] = queue["Name"]
-
-                datalist.append(records)
-            return datalist
+            return self._fan_out(fetch, self.queue_defs)
         except Exception as e:
             print("An error occurred in get_queue_processing_records():", str(e))
+            ERRORS.inc(method="get_queue_processing_records")
             return None
         
 
@@ -125,11 +489,12 @@ class OrchestratorTenantClient:
         try:
             request_url = self.base_url + f"monitoring/QueuesMonitoring/GetUnprocessedItemsCounts?timeFrameMinutes={time_frame_minutes}"
             headers = self._get_headers()
-            response = requests.get(request_url, headers=headers)
+            response = self._get(request_url, headers)
             data = response.json()
             return data
         except Exception as e:
             print("An error occurred in get_unprocessed_items():", str(e))
+            ERRORS.inc(method="get_unprocessed_items")
             return None
 
 
@@ -137,11 +502,14 @@ class OrchestratorTenantClient:
         try:
             request_url = self.base_url + f"monitoring/QueuesMonitoring/GetProcessedItemsCounts?timeFrameMinutes={time_frame_minutes}"
             headers = self._get_headers()
-            response = requests.get(request_url, headers=headers)
+            response = self._get(request_url, headers)
+            # An error body must not be taken for a snapshot of counters
+            response.raise_for_status()
             data = response.json()
             return data
         except Exception as e:
             print("An error occurred in get_transactions_overview():", str(e))
+            ERRORS.inc(method="get_transactions_overview")
             return None
         
 
@@ -149,11 +517,12 @@ class OrchestratorTenantClient:
         try:
             request_url = self.base_url + f"monitoring/QueuesMonitoring/GetProcessedItemsEvolution?timeFrameMinutes={time_frame_minutes}"
             headers = self._get_headers()
-            response = requests.get(request_url, headers=headers)
+            response = self._get(request_url, headers)
             data = response.json()
             return data
         except Exception as e:
             print("An error occurred in get_transactions_timeline():", str(e))
+            ERRORS.inc(method="get_transactions_timeline")
             return None
 
     ### Queue Functions End ###    
@@ -164,11 +533,12 @@ class OrchestratorTenantClient:
         try:
             request_url = self.base_url + f"monitoring/JobsMonitoring/GetFinishedJobsEvolution?timeFrameMinutes={time_frame_minutes}"
             headers = self._get_headers()
-            response = requests.get(request_url, headers=headers)
+            response = self._get(request_url, headers)
             data = response.json()
             return data
         except Exception as e:
             print("An error occurred in get_completed_jobs_timeline():", str(e))
+            ERRORS.inc(method="get_completed_jobs_timeline")
             return None
         
 
@@ -176,11 +546,12 @@ class OrchestratorTenantClient:
         try:
             request_url = self.base_url + f"monitoring/JobsMonitoring/GetJobsCounts?timeFrameMinutes={time_frame_minutes}"
             headers = self._get_headers()
-            response = requests.get(request_url, headers=headers)
+            response = self._get(request_url, headers)
             data = response.json()
             return data
         except Exception as e:
             print("An error occurred in get_triggered_job_states():", str(e))
+            ERRORS.inc(method="get_triggered_job_states")
             return None
         
 
@@ -188,11 +559,14 @@ class OrchestratorTenantClient:
         try:
             request_url = self.base_url + f"monitoring/JobsMonitoring/GetFinishedJobsCounts?timeFrameMinutes={time_frame_minutes}"
             headers = self._get_headers()
-            response = requests.get(request_url, headers=headers)
+            response = self._get(request_url, headers)
+            # An error body must not be taken for a snapshot of counters
+            response.raise_for_status()
             data = response.json()
             return data
         except Exception as e:
             print("An error occurred in get_completed_jobs_overview():", str(e))
+            ERRORS.inc(method="get_completed_jobs_overview")
             return None
         
 
@@ -200,11 +574,12 @@ class OrchestratorTenantClient:
         try:
             request_url = self.base_url + f"monitoring/JobsMonitoring/GetRunningJobsEvolution?timeFrameMinutes={time_frame_minutes}"
             headers = self._get_headers()
-            response = requests.get(request_url, headers=headers)
+            response = self._get(request_url, headers)
             data = response.json()
             return data
         except Exception as e:
             print("An error occurred in get_completed_jobs_timeframe():", str(e))
+            ERRORS.inc(method="get_completed_jobs_timeframe")
             return None
         
 
@@ -212,40 +587,57 @@ class OrchestratorTenantClient:
         try:
             request_url = self.base_url + f"api/Stats/GetJobsStats"
             headers = self._get_headers()
-            response = requests.get(request_url, headers=headers)
+            response = self._get(request_url, headers)
             data = response.json()
             return data
         except Exception as e:
             print("An error occurred in get_job_stats():", str(e))
+            ERRORS.inc(method="get_job_stats")
             return None
         
 
+    def iter_process_details_pages(
+        self,
+        time_frame_minutes: int = 1440,
+        pageSize: int = 1000,
+        orderBy: str = "processId",
+        direction: str = "asc"
+    ) -> Iterator[List[Dict]]:
+        """
+        Lazily yield every page of process details from Orchestrator. Errors propagate to the consumer.
+
+        :param time_frame_minutes: The timeframe in minutes to fetch the process data (default is 1440 or 24 hours).
+        :param pageSize: The number of items per page (default is 1000).
+        :param orderBy: The field to order the data by (default is 'processId').
+        :param direction: The order direction, either 'asc' or 'desc' (default is 'asc').
+        """
+        request_url = self.base_url + f"monitoring/JobsMonitoring/GetProcessesTable?timeFrameMinutes={time_frame_minutes}&orderBy={orderBy}&direction={direction}"
+        return self.iter_monitoring_pages(request_url, page_size=pageSize)
+
     def get_process_details_table(
         self, 
         time_frame_minutes: int = 1440, 
-        pageNo: int = 1, 
         pageSize: int = 1000, 
         orderBy: str = "processId", 
         direction: str = "asc"
     ) -> Optional[List[Dict]]:
         """
-        Fetch process details from Orchestrator.
+        Fetch all process details from Orchestrator, following every page.
 
         :param time_frame_minutes: The timeframe in minutes to fetch the process data (default is 1440 or 24 hours).
-        :param pageNo: The page number for pagination (default is 1).
         :param pageSize: The number of items per page (default is 1000).
         :param orderBy: The field to order the data by (default is 'processId').
         :param direction: The order direction, either 'asc' or 'desc' (default is 'asc').
         :return: A list of dictionaries with the process details or None if an error occurs.
         """
         try:
-            request_url = self.base_url + f"monitoring/JobsMonitoring/GetProcessesTable?timeFrameMinutes={time_frame_minutes}&pageNo={pageNo}&pageSize={pageSize}&orderBy={orderBy}&direction={direction}"
-            headers = self._get_headers()
-            response = requests.get(request_url, headers=headers)
-            data = response.json()["data"]
+            data = []
+            for page in self.iter_process_details_pages(time_frame_minutes, pageSize, orderBy, direction):
+                data.extend(page)
             return data
         except Exception as e:
             print("An error occurred in get_process_details_table():", str(e))
+            ERRORS.inc(method="get_process_details_table")
             return None
     ### Job/Process Functions End ###
 
@@ -253,139 +645,221 @@ class OrchestratorTenantClient:
         try:
             request_url = self.base_url + f"odata/Sessions/UiPath.Server.Configuration.OData.GetMachineSessionRuntimes?runtimeType=Unattended"
             headers = self._get_headers()
-            response = requests.get(request_url, headers=headers)
+            response = self._get(request_url, headers)
             data = response.json()["value"]
             return data
         except Exception as e:
             print("An error occurred in get_maintenance_mode_status():", str(e))
+            ERRORS.inc(method="get_maintenance_mode_status")
             return None
 
     
     
-    def get_faulted_jobs(self):
+    def get_faulted_jobs(self, days: int = 6, since: Optional[Dict[str, str]] = None):
+        """
+        Fetch faulted jobs for every folder.
+
+        :param days: Size of the look-back window for a folder with no watermark.
+        :param since: Optional map of folder Id (as str) to the latest EndTime already stored.
+            Only jobs that ended at or after that time are requested for the folder. EndTime rather
+            than CreationTime, because a long job created before a short one can fault after it.
+        :return: A list of faulted job dictionaries, including the job Key, EndTime ("Ended") and
+            FolderId that downstream upserts and watermarks rely on, or None if an error occurs.
+            A folder whose sweep fails part-way contributes no jobs, so its watermark stays put.
+        """
+        since = since or {}
         try:
             current_time = datetime.datetime.now()
-            creation_time = current_time - datetime.timedelta(days=6)
+            creation_time = current_time - datetime.timedelta(days=days)
             
             # Format the time to the required UTC format (ISO 8601)
             creation_time_str = creation_time.strftime('%Y-%m-%dT%H:%M:%S.%f')[:-3] + 'Z'
 
-            # Construct the URL
-            query_params = f"?$top=100&$filter=((CreationTime ge {creation_time_str}) and (State eq '4') and (ProcessType eq 'Process'))"
-            expand_params = "&$expand=Robot,Machine,Release&$orderby=StartTime desc"
-            
-            # Combine everything to form the final URL
-            full_url = self.base_url +"odata/Jobs"+ query_params + expand_params
+            def folder_url(folder_id) -> str:
+                # Construct the URL. Info is selected here so the fault reason arrives with the job
+                # instead of needing a GetByKey call per job; paging is added by iter_odata_pages
+                watermark = since.get(str(folder_id))
+                if watermark:
+                    # ge re-reads the jobs ending exactly at the mark; the upsert on Key absorbs them
+                    time_filter = f"EndTime ge {watermark}"
+                else:
+                    time_filter = f"CreationTime ge {creation_time_str}"
+                query_params = f"?$filter=(({time_filter}) and (State eq '4') and (ProcessType eq 'Process'))"
+                select_params = f"&$select={','.join(FAULTED_JOB_FIELDS)}&$orderby=StartTime desc"
+
+                # Combine everything to form the final URL
+                return self.base_url +"odata/Jobs"+ query_params + select_params
             
             
-            headers = self._get_headers()
-
-            faulted_jobs = []
-            for folder in self.folders:
+            def fetch(folder: Dict) -> Optional[List[Dict]]:
+                jobs = []
                 try:
                     folder_id = folder["Id"]
                     folder_name = folder["DisplayName"]
 
-                    headers["X-UIPATH-OrganizationUnitId"] = str(folder_id)
-                    response = requests.get(full_url, headers=headers).json()
-                    
-                    for faulted_job in response["value"]:
-
-                        job = {"Process_name":faulted_job["ReleaseName"],
-                            "Organization" : faulted_job["OrganizationUnitFullyQualifiedName"],
-                            "Folder" : folder_name,
-                            "Machine" : faulted_job["HostMachineName"],
-                            "Started":faulted_job["StartTime"],
-                            "Ended":faulted_job["EndTime"],
-                            "Reason":self.get_fault_reason(faulted_job["Key"],folder_id=folder_id)}
-                        
-                        faulted_jobs.append(job)
+                    headers = self._folder_headers(folder_id)
+                    for page in self.iter_odata_pages(folder_url(folder_id), headers):
+                        for faulted_job in page:
+
+                            job = {"Process_name":faulted_job["ReleaseName"],
+                                "Organization" : faulted_job["OrganizationUnitFullyQualifiedName"],
+                                "Folder" : folder_name,
+                                "Machine" : faulted_job["HostMachineName"],
+                                "Started":faulted_job["StartTime"],
+                                "Ended":faulted_job["EndTime"],
+                                "Reason":self._job_fault_reason(faulted_job, folder_id),
+                            "Key":faulted_job["Key"],
+                            "CreationTime":faulted_job["CreationTime"],
+                            "FolderId":str(folder_id)}
+                            
+                            jobs.append(job)
 
                 except Exception as e:
-                    print(e)
-                    continue
+                    # Pages are newest first, so the jobs read so far would move the watermark past the unread ones
+                    print(f"Error fetching faulted jobs of folder {folder.get('DisplayName')}: {e}")
+                    ERRORS.inc(method="get_faulted_jobs")
+                    return None
+                return jobs
+
+            faulted_jobs = []
+            for jobs in self._fan_out(fetch, self.folders):
+                if jobs is not None:
+                    faulted_jobs.extend(jobs)
 
             return faulted_jobs
 
         except Exception as e:
             print("An error occurred in get_faulted_jobs:", str(e))
+            ERRORS.inc(method="get_faulted_jobs")
             return None
-        
+
+    @staticmethod
+    def _format_fault_reason(info: Optional[str]) -> str:
+        return (info or "")[:200]+"..."
+
+    def _job_fault_reason(self, faulted_job: Dict, folder_id) -> str:
+        key = faulted_job["Key"]
+        with self._fault_reason_lock:
+            if key in self._fault_reasons:
+                self._fault_reasons.move_to_end(key)
+                return self._fault_reasons[key]
+
+        if "Info" in faulted_job:
+            reason = self._format_fault_reason(faulted_job["Info"])
+            self._remember_fault_reason(key, reason)
+            return reason
+        return self.get_fault_reason(key, folder_id=folder_id)
+
+    def _remember_fault_reason(self, key, reason: str):
+        with self._fault_reason_lock:
+            self._fault_reasons[key] = reason
+            self._fault_reasons.move_to_end(key)
+            while len(self._fault_reasons) > self.fault_reason_cache_size:
+                self._fault_reasons.popitem(last=False)
         
     def get_fault_reason(self,key,folder_id):
-        request_url = self.base_url + f"odata/Jobs/UiPath.Server.Configuration.OData.GetByKey(identifier={key})?$expand=Robot,Release,Machine"
-        headers = self._get_headers()
-        headers["X-UIPATH-OrganizationUnitId"] = str(folder_id)
+        with self._fault_reason_lock:
+            if key in self._fault_reasons:
+                self._fault_reasons.move_to_end(key)
+                return self._fault_reasons[key]
 
-        response = requests.get(request_url, headers=headers)
-        reason = response.json()["Info"]
-        return reason[:200]+"..."
+        request_url = self.base_url + f"odata/Jobs/UiPath.Server.Configuration.OData.GetByKey(identifier={key})?$select=Info"
+        headers = self._folder_headers(folder_id)
+
+        response = self._get(request_url, headers)
+        reason = self._format_fault_reason(response.json()["Info"])
+        self._remember_fault_reason(key, reason)
+        return reason
+
+    def get_disabled_triggers(self) -> Optional[List[Dict]]:
+        """
+        Fetch the disabled triggers of every folder.
 
-    def get_disabled_triggers(self):
+        :return: A list of schedule dictionaries, or None if the folders or any folder's schedules
+            could not be fetched. A partial list would replace the whole table, so none is returned.
+        """
         # Base API URL for retrieving Process Schedules with filters
-        query_params = "?$top=100&$filter=((Enabled eq false) and (QueueDefinitionId eq null))&$orderby=Name asc"
+        query_params = "?$filter=((Enabled eq false) and (QueueDefinitionId eq null))&$orderby=Name asc"
         full_url = self.base_url + "odata/ProcessSchedules" + query_params
         
-        headers = self._get_headers()
-
-        process_schedules = []
-        for folder in self.folders:
+        def fetch(folder: Dict) -> Optional[List[Dict]]:
+            schedules = []
             try:
                 folder_id = folder["Id"]
                 folder_name = folder["DisplayName"]
 
                 # Include the folder in the request headers
-                headers["X-UIPATH-OrganizationUnitId"] = str(folder_id)
-
-                # Make the API request for each folder
-                response = requests.get(full_url, headers=headers).json()
+                headers = self._folder_headers(folder_id)
+
+                # Loop through every page of schedules for the folder and extract relevant data
+                for page in self.iter_odata_pages(full_url, headers):
+                    for schedule in page:
+                        process_schedule = {
+                            "Name": schedule["Name"],
+                            "Enabled": schedule["Enabled"],
+                            "NextStart": schedule.get("NextStart", "N/A"),
+                            "Folder": folder_name
+                        }
+                        schedules.append(process_schedule)
+            except Exception as e:
+                print(f"Error fetching disabled triggers of folder {folder.get('DisplayName')}: {e}")
+                ERRORS.inc(method="get_disabled_triggers")
+                return None
+            return schedules
 
-                # If no schedules found, skip to the next folder
-                if int(response["@odata.count"]) == 0:
-                    continue
-                
-                # Loop through the schedules and extract relevant data
-                for schedule in response["value"]:
-                    process_schedule = {
-                        "Name": schedule["Name"],
-                        "Enabled": schedule["Enabled"],
-                        "NextStart": schedule.get("NextStart", "N/A"),
-                        "Folder": folder_name
-                    }
-                    process_schedules.append(process_schedule)
-            except:
-                continue
+        folders = self.folders
+        if folders is None:
+            return None
+        process_schedules = []
+        for schedules in self._fan_out(fetch, folders):
+            if schedules is None:
+                return None
+            process_schedules.extend(schedules)
         return process_schedules
 
 
-    def get_queue_data(self):
+    def get_queue_data(self) -> Optional[List[Dict]]:
+        """
+        Fetch the queues of every folder, merged by queue name.
+
+        :return: A list of queue dictionaries, or None if the folders or any folder's queues
+            could not be fetched.
+        """
         # Construct the URL for retrieving queue definitions
-        query_params = "?$top=20&$orderby=QueueDefinitionName%20asc"
+        query_params = "?$orderby=QueueDefinitionName%20asc"
         full_url = self.base_url + "odata/QueueDefinitions/UiPath.Server.Configuration.OData.ListQueues" + query_params
         
-        headers = self._get_headers()
+        def fetch(folder: Dict) -> Optional[List[Dict]]:
+            folder_name = folder.get("DisplayName")
+            try:
+                # Add the folder ID to the headers
+                headers = self._folder_headers(folder["Id"])
+                
+                # Collect every page of queues in the folder
+                queue_definitions = []
+                for page in self.iter_odata_pages(full_url, headers):
+                    queue_definitions.extend(page)
+                return queue_definitions
+            except Exception as e:
+                print(f"Error processing folder {folder_name}: {e}")
+                ERRORS.inc(method="get_queue_data")
+                return None
 
         # Dictionary to track queue definitions by QueueDefinitionName
         queue_data_dict = {}
 
-        for folder in self.folders:
+        # Responses come back in folder order, so merging here gives the same result as a sequential sweep
+        folders = self.folders
+        if folders is None:
+            return None
+        results = self._fan_out(fetch, folders)
+        if any(queue_definitions is None for queue_definitions in results):
+            return None
+        for folder, queue_definitions in zip(folders, results):
+            folder_name = folder.get("DisplayName")
             try:
-                folder_id = folder["Id"]
-                folder_name = folder["DisplayName"]
-
-                # Add the folder ID to the headers
-                headers["X-UIPATH-OrganizationUnitId"] = str(folder_id)
-                
-                # Make the GET request
-                response = requests.get(full_url, headers=headers).json()
-                
-                
-                # Check if there are any queues in the response
-                if int(response["@odata.count"]) == 0:
-                    continue
-
                 # Iterate over the queue definitions in the "value" list
-                for queue_definition in response["value"]:
+                for queue_definition in queue_definitions:
                     queue_name = queue_definition["QueueDefinitionName"]
                     
                     # If the queue already exists, concatenate the folder names
@@ -403,6 +877,7 @@ class OrchestratorTenantClient:
             
             except Exception as e:
                 print(f"Error processing folder {folder_name}: {e}")
+                ERRORS.inc(method="get_queue_data")
                 continue
 
         # Convert the dictionary values to a list before returning
@@ -0,0 +1,193 @@
+import datetime
+import decimal
+import os
+import time
+from typing import Dict, List, Optional
+
+from metrics import ERRORS
+from MySQLSchema import SURROGATE_KEY
+from MySQLWriter import MySQLConnectionPool
+
+# information_schema DATA_TYPE -> name of the pyarrow type factory the column is archived as
+ARROW_TYPES = {
+    "datetime": "timestamp",
+    "timestamp": "timestamp",
+    "date": "date32",
+    "tinyint": "int64",
+    "smallint": "int64",
+    "mediumint": "int64",
+    "int": "int64",
+    "bigint": "int64",
+    "double": "float64",
+    "float": "float64",
+    "decimal": "float64",
+}
+
+
+def _arrow_type(data_type: str):
+    import pyarrow as pa
+    name = ARROW_TYPES.get(data_type, "string")
+    return pa.timestamp("ms") if name == "timestamp" else getattr(pa, name)()
+
+
+def _plain(value):
+    if isinstance(value, decimal.Decimal):
+        return float(value)
+    if isinstance(value, (bytes, bytearray)):
+        return value.decode("utf-8", "replace")
+    return value
+
+
+class ParquetArchive:
+    """
+    Cold tier for the collector's history tables: rows older than a cutoff are moved out of
+    MySQL into zstd-compressed Parquet files on local disk, one directory per day:
+
+        <archive_dir>/<database>/<table>/date=2024-05-01/part-<first row_id>-<last row_id>.parquet
+
+    A day is written to a .tmp file and renamed before its rows are deleted from MySQL, so a
+    crash leaves the rows in MySQL and the next run writes the same file name again. Rows that
+    arrive late for an archived day land in a second part file.
+
+    Column types follow the MySQL table (DATETIME -> timestamp, integers -> int64, DOUBLE ->
+    float64, everything else -> string), so parts written months apart agree on their types.
+    pyarrow is imported only when the archive is used.
+    """
+    def __init__(self, pool: MySQLConnectionPool, database: str, archive_dir: str, delete_chunk_size: int = 10000):
+        self.pool = pool
+        self.database = database
+        self.directory = os.path.join(archive_dir, database)
+        self.delete_chunk_size = delete_chunk_size
+
+    def _day_directory(self, table_name: str, day: datetime.date) -> str:
+        return os.path.join(self.directory, table_name, f"date={day.isoformat()}")
+
+    def _query(self, query: str, args: tuple) -> tuple:
+        # A connection is borrowed per statement and returned before the rows are processed,
+        # so a long archive run does not hold one the other tenants' writes are waiting for
+        with self.pool.connection() as connection:
+            with connection.cursor() as cursor:
+                cursor.execute(query, args)
+                rows = cursor.fetchall()
+            connection.commit()
+        return rows
+
+    def _execute(self, query: str, args: tuple) -> int:
+        with self.pool.connection() as connection:
+            with connection.cursor() as cursor:
+                cursor.execute(query, args)
+                affected = cursor.rowcount
+            connection.commit()
+        return affected
+
+    def archive_table(self, table_name: str, time_column: str, older_than_days: int) -> int:
+        """
+        Move the rows of a table whose time_column is older than older_than_days (counted in
+        whole UTC days) to Parquet, one day at a time.
+
+        Returns:
+            int: The number of rows archived.
+        """
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        table = f"`{self.database}`.`{table_name}`"
+        cutoff = datetime.datetime.now(datetime.timezone.utc).date() - datetime.timedelta(days=older_than_days)
+        archived = 0
+        started = time.perf_counter()
+        columns = {name: data_type for name, data_type in self._query(
+            "SELECT COLUMN_NAME, DATA_TYPE FROM information_schema.COLUMNS "
+            "WHERE TABLE_SCHEMA = %s AND TABLE_NAME = %s ORDER BY ORDINAL_POSITION",
+            (self.database, table_name))}
+        if time_column not in columns:
+            return 0
+        schema = pa.schema([(name, _arrow_type(data_type)) for name, data_type in columns.items()])
+        column_list = ", ".join(f"`{name}`" for name in columns)
+
+        days = sorted(row[0] for row in self._query(
+            f"SELECT DISTINCT DATE(`{time_column}`) FROM {table} WHERE `{time_column}` < %s", (cutoff,))
+            if row[0] is not None)
+        for day in days:
+            bounds = (day, day + datetime.timedelta(days=1))
+            rows = self._query(f"SELECT {column_list} FROM {table} "
+                               f"WHERE `{time_column}` >= %s AND `{time_column}` < %s ORDER BY `{SURROGATE_KEY}`", bounds)
+            if not rows:
+                continue
+            data = {name: [_plain(row[i]) for row in rows] for i, name in enumerate(columns)}
+
+            # No connection is held while the file is encoded and written
+            directory = self._day_directory(table_name, day)
+            os.makedirs(directory, exist_ok=True)
+            first_id, last_id = data[SURROGATE_KEY][0], data[SURROGATE_KEY][-1]
+            path = os.path.join(directory, f"part-{first_id}-{last_id}.parquet")
+            pq.write_table(pa.Table.from_pydict(data, schema=schema), path + ".tmp", compression="zstd")
+            os.replace(path + ".tmp", path)
+
+            # Only rows that made it into the file are removed; each chunk borrows a connection and commits on its own
+            while True:
+                deleted = self._execute(f"DELETE FROM {table} WHERE `{time_column}` >= %s AND `{time_column}` < %s "
+                                        f"AND `{SURROGATE_KEY}` <= %s LIMIT {self.delete_chunk_size}",
+                                        bounds + (last_id,))
+                if deleted < self.delete_chunk_size:
+                    break
+            archived += len(rows)
+
+        if archived:
+            print(f" {archived} rows of {table_name} older than {cutoff} archived to {self.directory} "
+                  f"in {time.perf_counter() - started:.3f}s.")
+        return archived
+
+    def read(
+        self,
+        table_name: str,
+        start: datetime.date,
+        end: datetime.date,
+        columns: Optional[List[str]] = None
+    ):
+        """
+        Load the archived rows of a table for the days start..end (inclusive) as a pyarrow Table.
+
+        Only the day directories in the range are opened, only the requested columns are
+        decoded, and files are memory-mapped rather than read into memory first. Parts with
+        different columns are merged, missing values becoming nulls.
+
+        Args:
+            table_name (str): The archived table.
+            start, end (date): First and last day to load.
+            columns (List[str]): Columns to load; all of them when omitted.
+
+        Returns:
+            pyarrow.Table: The rows, oldest day first. Use .to_pandas() for a DataFrame.
+        """
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        parts = []
+        day = start
+        while day <= end:
+            directory = self._day_directory(table_name, day)
+            if os.path.isdir(directory):
+                for name in sorted(os.listdir(directory)):
+                    if not name.endswith(".parquet"):
+                        continue
+                    path = os.path.join(directory, name)
+                    # Parts written before the table gained a column do not have it; it comes back as nulls
+                    present = None if columns is None else [c for c in columns if c in pq.read_schema(path).names]
+                    parts.append(pq.read_table(path, columns=present, memory_map=True))
+            day += datetime.timedelta(days=1)
+        if not parts:
+            return pa.table({name: [] for name in columns or []})
+        return pa.concat_tables(parts, promote_options="default")
+
+    def archive_tables(self, tables: Dict[str, str], older_than_days: int) -> int:
+        """
+        Archive several tables, given as table -> time column. A table that fails is logged and skipped.
+        """
+        archived = 0
+        for table_name, time_column in tables.items():
+            try:
+                archived += self.archive_table(table_name, time_column, older_than_days)
+            except Exception as e:
+                print(f"Error archiving {table_name}: {e}")
+                ERRORS.inc(method="archive_table")
+        return archived
@@ -0,0 +1,184 @@
+import hashlib
+import json
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Union
+
+from MySQLSchema import is_missing
+
+
+def flatten_record(record: Dict, sep: str = ".", _prefix: str = "", _level: int = 0) -> Dict:
+    """
+    Flatten nested dictionaries into one level, naming and ordering keys the way
+    pandas.json_normalize does: nested keys are joined with sep ("queue.name"), top-level
+    scalars keep their position and flattened sub-dictionaries are appended after them.
+    Lists are kept as values.
+    """
+    if _level == 0 and not any(isinstance(value, dict) for value in record.values()):
+        return record
+
+    flat = dict(record)
+    for key, value in record.items():
+        name = key if _level == 0 else f"{_prefix}{sep}{key}"
+        if not isinstance(value, dict):
+            if _level != 0:
+                flat[name] = flat.pop(key)
+            continue
+        del flat[key]
+        flat.update(flatten_record(value, sep, name, _level + 1))
+    return flat
+
+
+class RecordBatch:
+    """
+    A column-major table of API records, used in place of a pandas DataFrame on the write path.
+
+    Each column is a plain list and all columns have the same length. Values a record does not
+    have are None. Rows are produced lazily by rows(), in column order, which is the shape
+    MySQLWriter.write_rows() expects, so no per-row objects are built between the API response
+    and the INSERT.
+    """
+    def __init__(self, columns: Optional[Dict[str, List]] = None):
+        self._columns: Dict[str, List] = columns or {}
+
+    @classmethod
+    def from_records(cls, records: Union[Dict, Iterable[Dict]], sep: str = ".") -> "RecordBatch":
+        """
+        Build a batch from one API dictionary or a list of them. Column names and order match
+        pandas.json_normalize(records).
+        """
+        if isinstance(records, dict):
+            records = [records]
+
+        columns: Dict[str, List] = {}
+        count = 0
+        for record in records:
+            for key, value in flatten_record(record, sep).items():
+                column = columns.get(key)
+                if column is None:
+                    column = columns[key] = [None] * count
+                column.append(value)
+            count += 1
+            # Pad the columns this record did not have
+            for column in columns.values():
+                if len(column) < count:
+                    column.append(None)
+        return cls(columns)
+
+    @classmethod
+    def concat(cls, batches: Iterable["RecordBatch"]) -> "RecordBatch":
+        """
+        Stack batches vertically. Columns are the union of the inputs, in order of first appearance.
+        """
+        columns: Dict[str, List] = {}
+        count = 0
+        for batch in batches:
+            size = len(batch)
+            for name, values in batch._columns.items():
+                column = columns.get(name)
+                if column is None:
+                    column = columns[name] = [None] * count
+                column.extend(values)
+            count += size
+            for column in columns.values():
+                if len(column) < count:
+                    column.extend([None] * (count - len(column)))
+        return cls(columns)
+
+    def __len__(self) -> int:
+        for column in self._columns.values():
+            return len(column)
+        return 0
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._columns
+
+    @property
+    def columns(self) -> List[str]:
+        return list(self._columns)
+
+    @property
+    def empty(self) -> bool:
+        return len(self) == 0
+
+    def column(self, name: str) -> List:
+        return self._columns[name]
+
+    def set_column(self, name: str, values: Union[Sequence, Any]):
+        """
+        Add or replace a column. A scalar is broadcast to every row.
+        """
+        if isinstance(values, (list, tuple)):
+            if self._columns and len(values) != len(self):
+                raise ValueError(f"Column {name} has {len(values)} values, expected {len(self)}")
+            self._columns[name] = list(values)
+        else:
+            self._columns[name] = [values] * len(self)
+        return self
+
+    def map_column(self, name: str, func: Callable[[Any], Any]):
+        """
+        Apply func to every present value of a column; missing values stay None.
+        """
+        self._columns[name] = [None if is_missing(value) else func(value) for value in self._columns[name]]
+        return self
+
+    def drop(self, names: Iterable[str]):
+        """
+        Remove columns; names that are not in the batch are ignored.
+        """
+        for name in names:
+            self._columns.pop(name, None)
+        return self
+
+    def fillna(self, value: Any):
+        """
+        Replace missing values in every column with value.
+        """
+        for name, column in self._columns.items():
+            self._columns[name] = [value if is_missing(item) else item for item in column]
+        return self
+
+    def max_by(self, key: str, value: str, parse: Optional[Callable[[Any], Any]] = None) -> Dict[Any, Any]:
+        """
+        Largest present value of one column for each distinct value of another, e.g. the latest
+        EndTime per FolderId. With parse, values are compared by what it returns (None counts as
+        missing), so ISO timestamps with different precision or offsets compare as times rather
+        than as strings; the original values are returned.
+        """
+        latest: Dict[Any, Any] = {}
+        order: Dict[Any, Any] = {}
+        for group, item in zip(self._columns[key], self._columns[value]):
+            if is_missing(group) or is_missing(item):
+                continue
+            rank = parse(item) if parse else item
+            if rank is None:
+                continue
+            if group not in latest or rank > order[group]:
+                latest[group] = item
+                order[group] = rank
+        return latest
+
+    def content_hash(self) -> str:
+        """
+        Stable digest of the column names and values, used to detect an unchanged payload.
+        """
+        digest = hashlib.sha1()
+        for name, column in self._columns.items():
+            digest.update(json.dumps([name, column], sort_keys=True, default=str).encode("utf-8"))
+        return digest.hexdigest()
+
+    def rows(self) -> Iterator[tuple]:
+        """
+        Iterate over the rows as tuples in column order.
+        """
+        return zip(*self._columns.values())
+
+    def to_records(self) -> List[Dict]:
+        names = self.columns
+        return [dict(zip(names, row)) for row in self.rows()]
+
+    def to_pandas(self):
+        """
+        Convert to a pandas DataFrame. pandas is only imported when this is called.
+        """
+        import pandas as pd
+        return pd.DataFrame(self._columns, columns=self.columns)
@@ -0,0 +1,78 @@
+import json
+import re
+import threading
+from urllib.parse import unquote, urlsplit
+
+import requests
+
+# Everything after this marker in an Orchestrator URL is the same for every tenant
+ORCHESTRATOR_MARKER = "orchestrator_/"
+
+# Query parts that depend on when or after what the request was made, e.g. "CreationTime ge 2024-05-01T10:00:00.000Z",
+# "EndTime ge <watermark>" or "daysNo=3"; they are masked so a recording replays on any later run
+TIME_FILTER = re.compile(r"\w+ (?:eq|ne|gt|ge|lt|le) \d{4}-\d{2}-\d{2}T[\d:.]+Z?")
+DAYS_PARAMETER = re.compile(r"\bdaysNo=\d+")
+
+
+def relative_path(url: str) -> str:
+    """
+    Orchestrator path and query of a URL without the organisation/tenant prefix, e.g.
+    "odata/Folders" or "monitoring/JobsMonitoring/GetJobsCounts?timeFrameMinutes=1440".
+    """
+    parts = urlsplit(url)
+    path = unquote(parts.path)
+    if ORCHESTRATOR_MARKER in path:
+        path = path.split(ORCHESTRATOR_MARKER, 1)[1]
+    path = path.lstrip("/")
+    return f"{path}?{unquote(parts.query)}" if parts.query else path
+
+
+def replay_key(path: str) -> str:
+    """
+    The path a recorded response is matched on: relative_path() with time-valued filters masked.
+    """
+    return DAYS_PARAMETER.sub("daysNo=*", TIME_FILTER.sub("<time filter>", path))
+
+
+class ResponseRecorder:
+    """
+    Appends every Orchestrator API response seen by a requests.Session to a JSONL file,
+    one object per response:
+
+        {"method": "GET", "path": "odata/Jobs?$filter=...", "folder": "123", "status": 200,
+         "elapsed_ms": 84.1, "body": {...}}
+
+    The file can be served back by replay_server.py to run the collector and the benchmarks
+    without a live tenant. Token requests are never recorded, so the file holds no credentials.
+    """
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def attach(self, session: requests.Session) -> requests.Session:
+        session.hooks["response"].append(self._record)
+        return session
+
+    def _record(self, response: requests.Response, *args, **kwargs):
+        request = response.request
+        if request.method != "GET":
+            return  # Only the OAuth token exchange is a POST
+
+        try:
+            body = response.json()
+        except ValueError:
+            body = None
+        entry = {
+            "method": request.method,
+            "path": relative_path(request.url),
+            "folder": request.headers.get("X-UIPATH-OrganizationUnitId"),
+            "status": response.status_code,
+            "elapsed_ms": round(response.elapsed.total_seconds() * 1000, 1),
+            "body": body,
+        }
+        if body is None:
+            entry["text"] = response.text
+        line = json.dumps(entry) + "\n"
+        with self._lock:
+            with open(self.path, "a", encoding="utf-8") as recording:
+                recording.write(line)
@@ -0,0 +1,289 @@
+import datetime
+import decimal
+import itertools
+import json
+import os
+import threading
+import time
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+import pymysql
+
+from metrics import ERRORS, SPOOL_EVICTED, SPOOL_PENDING_BYTES
+from MySQLWriter import MySQLConnectionPool, MySQLWriter
+
+# Server error codes worth retrying: too many connections, server shutdown, lock wait timeout, deadlock.
+# Client-side codes (2000 and up) mean the server could not be reached at all.
+RETRYABLE_MYSQL_CODES = {1040, 1053, 1205, 1213}
+
+
+def is_retryable(error: Exception) -> bool:
+    """
+    True when a write failed because MySQL was unavailable rather than because of the data.
+    """
+    if isinstance(error, (pymysql.err.InterfaceError, ConnectionError)):
+        return True
+    if isinstance(error, pymysql.err.OperationalError) and error.args:
+        code = error.args[0]
+        return isinstance(code, int) and (code >= 2000 or code in RETRYABLE_MYSQL_CODES)
+    return False
+
+
+def _encode(value):
+    if isinstance(value, (datetime.datetime, datetime.date)):
+        return value.isoformat()
+    if isinstance(value, decimal.Decimal):
+        return float(value)
+    return str(value)
+
+
+class SpoolingWriter(MySQLWriter):
+    """
+    A MySQLWriter that puts every write on disk first and applies it to MySQL in the background.
+
+    Each write (and each rollup refresh) becomes one append-only JSONL segment in
+    spool_dir/<database>: a header line naming the operation followed by one line per chunk of
+    rows. A segment is written under a .tmp name and renamed once complete, so the flusher only
+    ever sees whole jobs. The flusher replays completed segments in the order they were created
+    through the normal MySQLWriter path (staging swap, upserts, typed tables) and deletes each one
+    once MySQL has committed it.
+
+    While MySQL is unreachable segments accumulate and are retried every flush_interval, so the
+    data already fetched from Orchestrator is not lost and does not have to be fetched again.
+    The spool is bounded: the oldest segments are evicted once it grows past max_bytes, and
+    segments older than max_age seconds are dropped. A segment MySQL rejects for any other reason
+    is moved to a failed/ directory so it cannot block the ones behind it.
+
+    The collector state a write advances (see MySQLWriter) travels in its segment header. It is
+    staged in the StateStore when the segment is spooled and saved by the flusher once MySQL has
+    committed the write; a segment that is evicted or moved to failed/ has its state discarded,
+    so the data is fetched and written again instead of being skipped as already stored.
+    """
+    def __init__(
+        self,
+        pool: MySQLConnectionPool,
+        database: str,
+        spool_dir: str,
+        batch_size: int = 500,
+        max_bytes: int = 512 * 1024 * 1024,
+        max_age: float = 24 * 3600,
+        flush_interval: float = 5.0,
+        state_store=None
+    ):
+        super().__init__(pool, database, batch_size=batch_size, state_store=state_store)
+        self.directory = os.path.join(spool_dir, database)
+        self.failed_directory = os.path.join(self.directory, "failed")
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self.flush_interval = flush_interval
+        self._sequence = itertools.count()
+        self._flush_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        os.makedirs(self.failed_directory, exist_ok=True)
+
+        # A .tmp segment is a job the previous process did not finish writing
+        for name in os.listdir(self.directory):
+            if name.endswith(".tmp"):
+                os.remove(os.path.join(self.directory, name))
+
+    ### Spooling ###
+
+    def _segment_path(self, table_name: str) -> str:
+        # Nanosecond time keeps the order across restarts; the counter breaks ties within one
+        return os.path.join(self.directory, f"{time.time_ns():020d}-{next(self._sequence):06d}-{table_name}.jsonl")
+
+    def _spool(self, header: Dict, batches: Iterable[Tuple[List[str], Iterable[Sequence]]] = ()) -> int:
+        path = self._segment_path(header["table"])
+        spooled = 0
+        has_columns = False
+        try:
+            with open(path + ".tmp", "w", encoding="utf-8") as segment:
+                segment.write(json.dumps(header, default=_encode) + "\n")
+                for columns, rows in batches:
+                    if not columns:
+                        continue
+                    has_columns = True
+                    rows = iter(rows)
+                    # The first chunk is written even when empty, so the flusher still creates the table
+                    chunk = list(itertools.islice(rows, self.batch_size))
+                    while True:
+                        segment.write(json.dumps({"columns": columns, "rows": chunk}, default=_encode) + "\n")
+                        spooled += len(chunk)
+                        chunk = list(itertools.islice(rows, self.batch_size))
+                        if not chunk:
+                            break
+        except BaseException:
+            # A job whose rows could not all be produced is not spooled at all
+            os.remove(path + ".tmp")
+            raise
+
+        # A write with no columns at all is dropped, unless it is a snapshot: an empty snapshot still replaces the table
+        if header["op"] == "write" and not has_columns and not header["trunc"]:
+            os.remove(path + ".tmp")
+            return 0
+        if header.get("state") and self.state_store is not None:
+            # Staged before the flusher can see the segment, so its commit always comes after
+            self.state_store.stage(header["state"])
+        os.replace(path + ".tmp", path)
+        self._enforce_bounds()
+        return spooled
+
+    def write_batches(
+        self,
+        table_name: str,
+        batches: Iterable[Tuple[List[str], Iterable[Sequence]]],
+        trunc: bool = False,
+        key_columns: Optional[List[str]] = None,
+        missing_text: Optional[str] = None,
+        state: Optional[Dict] = None
+    ) -> int:
+        """
+        Spool a write for the flusher. See MySQLWriter.write_batches(); state is saved once the
+        flusher has applied the write.
+
+        Returns:
+            int: The number of rows spooled.
+        """
+        spooled = self._spool({"op": "write", "table": table_name, "trunc": trunc, "key_columns": key_columns,
+                               "missing_text": missing_text, "state": state}, batches)
+        print(f" {spooled} rows spooled for {table_name}.")
+        return spooled
+
+    def refresh_rollups(self, table_name: str, time_column: str, start, end, **kwargs):
+        """
+        Spool a rollup refresh so it runs after the write it depends on. See MySQLWriter.refresh_rollups().
+        """
+        self._spool({"op": "refresh_rollups", "table": table_name, "time_column": time_column,
+                     "start": start, "end": end, "kwargs": kwargs})
+
+    ### Bounds ###
+
+    def _segments(self) -> List[str]:
+        return sorted(name for name in os.listdir(self.directory) if name.endswith(".jsonl"))
+
+    def _enforce_bounds(self):
+        now = time.time()
+        sizes = []
+        for name in self._segments():
+            path = os.path.join(self.directory, name)
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                continue  # Flushed in the meantime
+            if now - stat.st_mtime > self.max_age:
+                self._evict(path, "older than max_age")
+            else:
+                sizes.append((path, stat.st_size))
+
+        total = sum(size for _, size in sizes)
+        for path, size in sizes:
+            if total <= self.max_bytes:
+                break
+            self._evict(path, "spool over max_bytes")
+            total -= size
+        SPOOL_PENDING_BYTES.set(total, schema=self.database)
+
+    def _discard_state(self, path: str):
+        # The state a dropped write would have advanced stays where it was, so its data is written again
+        if self.state_store is None:
+            return
+        try:
+            with open(path, encoding="utf-8") as segment:
+                header = json.loads(segment.readline())
+        except (OSError, ValueError):
+            return
+        if header.get("state"):
+            self.state_store.discard(header["state"])
+
+    def _evict(self, path: str, reason: str):
+        self._discard_state(path)
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            return
+        SPOOL_EVICTED.inc(schema=self.database)
+        print(f"Evicted spooled write {os.path.basename(path)} ({reason})")
+
+    ### Flushing ###
+
+    def _read_batches(self, segment) -> Iterator[Tuple[List[str], List[Sequence]]]:
+        for line in segment:
+            chunk = json.loads(line)
+            yield chunk["columns"], chunk["rows"]
+
+    def _apply(self, path: str):
+        with open(path, encoding="utf-8") as segment:
+            header = json.loads(segment.readline())
+            if header["op"] == "write":
+                MySQLWriter.write_batches(self, header["table"], self._read_batches(segment),
+                                          trunc=header["trunc"], key_columns=header["key_columns"],
+                                          missing_text=header.get("missing_text"), state=header.get("state"))
+            elif header["op"] == "refresh_rollups":
+                MySQLWriter.refresh_rollups(self, header["table"], header["time_column"],
+                                            datetime.datetime.fromisoformat(header["start"]),
+                                            datetime.datetime.fromisoformat(header["end"]),
+                                            **header["kwargs"])
+            else:
+                raise ValueError(f"Unknown spooled operation {header['op']}")
+
+    def flush(self) -> int:
+        """
+        Apply every completed segment to MySQL, oldest first. Stops at the first connection
+        error and leaves the remaining segments for the next flush.
+
+        Returns:
+            int: The number of segments applied.
+        """
+        applied = 0
+        with self._flush_lock:
+            self._enforce_bounds()
+            for name in self._segments():
+                path = os.path.join(self.directory, name)
+                try:
+                    self._apply(path)
+                except FileNotFoundError:
+                    continue  # Evicted while waiting
+                except Exception as e:
+                    if is_retryable(e):
+                        print(f"MySQL unavailable, {name} stays spooled: {e}")
+                        ERRORS.inc(method="spool_flush")
+                        break
+                    print(f"Spooled write {name} failed and was moved to {self.failed_directory}: {e}")
+                    ERRORS.inc(method="spool_flush")
+                    self._discard_state(path)
+                    os.replace(path, os.path.join(self.failed_directory, name))
+                    continue
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass  # Evicted while it was being applied
+                applied += 1
+            self._enforce_bounds()
+        return applied
+
+    def _run(self):
+        while True:
+            try:
+                self.flush()
+            except Exception as e:
+                print(f"Error flushing the write spool for {self.database}: {e}")
+                ERRORS.inc(method="spool_flush")
+            if self._stop.wait(self.flush_interval):
+                return
+
+    def start(self):
+        """
+        Start the background flusher. Segments left by a previous run are applied first.
+        """
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name=f"spool-{self.database}", daemon=True)
+            self._thread.start()
+
+    def stop(self, flush: bool = True):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        if flush:
+            self.flush()
@@ -0,0 +1,129 @@
+import json
+import threading
+import time
+from typing import Any, Dict, Optional
+
+from metrics import ERRORS
+from MySQLWriter import MySQLConnectionPool
+
+
+class StateStore:
+    """
+    Small key/value store for collector bookkeeping such as ingestion watermarks.
+
+    Values are cached in memory and persisted as JSON in a `collector_state` table
+    inside the tenant's schema, so they survive restarts and are naturally scoped
+    per tenant.
+
+    State that describes a write still waiting in the spool is staged rather than set:
+    stage() makes it visible to get() right away, so the same snapshot is not spooled
+    again on the next tick, and set_many() persists it once the write has reached MySQL.
+    discard() drops staged values whose write was given up, so the data is written again.
+
+    If the table cannot be read (MySQL down at startup) the store runs without saved
+    state and retries the load every retry_interval seconds; set_many() always retries it,
+    creating the table first.
+    """
+    def __init__(self, pool: MySQLConnectionPool, database: str, table_name: str = "collector_state",
+                 retry_interval: float = 60.0):
+        self.pool = pool
+        self.database = database
+        self.table_name = table_name
+        self.retry_interval = retry_interval
+        self._values: Optional[Dict[str, Any]] = None
+        self._staged: Dict[str, Any] = {}
+        self._retry_at = 0.0
+        self._lock = threading.Lock()
+
+    @property
+    def _table(self) -> str:
+        return f"`{self.database}`.`{self.table_name}`"
+
+    def _load(self, force: bool = False) -> Dict[str, Any]:
+        # With force the load is attempted even within the retry interval, and a failure raises
+        if self._values is not None:
+            return self._values
+        if not force and time.monotonic() < self._retry_at:
+            return {}
+
+        values = {}
+        try:
+            with self.pool.connection() as connection:
+                with connection.cursor() as cursor:
+                    cursor.execute(f"""
+                        CREATE TABLE IF NOT EXISTS {self._table} (
+                            state_key VARCHAR(255) NOT NULL PRIMARY KEY,
+                            state_value TEXT,
+                            updated_at TIMESTAMP(3) NOT NULL DEFAULT CURRENT_TIMESTAMP(3) ON UPDATE CURRENT_TIMESTAMP(3)
+                        )
+                    """)
+                    cursor.execute(f"SELECT state_key, state_value FROM {self._table}")
+                    for key, value in cursor.fetchall():
+                        values[key] = json.loads(value) if value is not None else None
+                connection.commit()
+        except Exception as e:
+            if force:
+                raise
+            # Without saved state every watermark falls back to its full look-back window
+            # and every snapshot is written once more, which is safe, just not incremental
+            print(f"Could not load {self._table}, running without saved state for {self.retry_interval:.0f}s: {e}")
+            ERRORS.inc(method="state_load")
+            self._retry_at = time.monotonic() + self.retry_interval
+            return {}
+        self._values = values
+        return values
+
+    def get(self, key: str, default: Any = None, staged: bool = True) -> Any:
+        """
+        The latest value of a key. With staged=False a value whose write is still spooled is
+        ignored, which is what an incremental query needs: its watermark must only move once
+        the rows below it are in MySQL.
+        """
+        with self._lock:
+            if staged and key in self._staged:
+                return self._staged[key]
+            return self._load().get(key, default)
+
+    def set(self, key: str, value: Any):
+        self.set_many({key: value})
+
+    def set_many(self, values: Dict[str, Any]):
+        """
+        Persist several keys in one statement, then update the in-memory copy.
+        """
+        if not values:
+            return
+        with self._lock:
+            # Loading creates the table, which may not exist yet if MySQL was down at startup
+            cached = self._load(force=True)
+            rows = [(key, json.dumps(value)) for key, value in values.items()]
+            with self.pool.connection() as connection:
+                with connection.cursor() as cursor:
+                    cursor.executemany(
+                        f"INSERT INTO {self._table} (state_key, state_value) VALUES (%s, %s) "
+                        f"ON DUPLICATE KEY UPDATE state_value = VALUES(state_value)",
+                        rows
+                    )
+                connection.commit()
+            cached.update(values)
+            self._unstage(values)
+
+    def stage(self, values: Dict[str, Any]):
+        """
+        Make values visible to get() without persisting them, for a write that is still spooled.
+        """
+        with self._lock:
+            self._staged.update(values)
+
+    def discard(self, values: Dict[str, Any]):
+        """
+        Drop staged values whose write will never be applied; get() falls back to the persisted ones.
+        """
+        with self._lock:
+            self._unstage(values)
+
+    def _unstage(self, values: Dict[str, Any]):
+        # A key staged again since holds a newer value, which stays
+        for key, value in values.items():
+            if key in self._staged and self._staged[key] == value:
+                del self._staged[key]
@@ -0,0 +1,109 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional
+
+from metrics import ERRORS, TASK_LAST_SUCCESS, TASK_SECONDS, TASK_SKIPPED
+
+
+class ScheduledTask:
+    """
+    A function run every `interval` seconds, with bookkeeping for the last run.
+    """
+    def __init__(self, name: str, func: Callable[[], Any], interval: float, run_immediately: bool = False):
+        self.name = name
+        self.func = func
+        self.interval = interval
+        self.next_run = time.monotonic() + (0 if run_immediately else interval)
+        self.running = False
+        self.runs = 0
+        self.skipped = 0
+        self.last_started_at: Optional[float] = None
+        self.last_duration: Optional[float] = None
+        self.last_result_size: Optional[int] = None
+        self.last_error: Optional[str] = None
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "interval": self.interval,
+            "running": self.running,
+            "runs": self.runs,
+            "skipped": self.skipped,
+            "last_started_at": self.last_started_at,
+            "last_duration": self.last_duration,
+            "last_result_size": self.last_result_size,
+            "last_error": self.last_error,
+        }
+
+
+class TaskScheduler:
+    """
+    Runs independent tasks on a shared worker pool, each on its own interval.
+
+    A task that is still running when it comes due again is not started a second time;
+    the missed run is counted in `skipped` and the task is simply run at its next slot.
+    Every run records its wall-clock start, duration and result size (the number
+    returned by the task, e.g. rows written).
+    """
+    def __init__(self, max_workers: int = 8):
+        self.tasks: List[ScheduledTask] = []
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="task")
+        self._lock = threading.Lock()
+
+    def add(self, name: str, func: Callable[[], Any], interval: float, run_immediately: bool = False) -> ScheduledTask:
+        task = ScheduledTask(name, func, interval, run_immediately)
+        self.tasks.append(task)
+        return task
+
+    def _run(self, task: ScheduledTask):
+        started = time.perf_counter()
+        task.last_started_at = time.time()
+        try:
+            result = task.func()
+            task.last_result_size = result if isinstance(result, int) else None
+            task.last_error = None
+            # Inserters log their own errors and return None; only a real result counts as success
+            if result is not None:
+                TASK_LAST_SUCCESS.set_to_current_time(task=task.name)
+        except Exception as e:
+            task.last_error = str(e)
+            print(f"Error in task {task.name}: {e}")
+            ERRORS.inc(method=task.name)
+        finally:
+            task.last_duration = time.perf_counter() - started
+            TASK_SECONDS.observe(task.last_duration, task=task.name)
+            task.runs += 1
+            with self._lock:
+                task.running = False
+            print(f"Task {task.name} finished in {task.last_duration:.2f}s, result size {task.last_result_size}")
+
+    def run_pending(self):
+        current = time.monotonic()
+        for task in self.tasks:
+            if current < task.next_run:
+                continue
+
+            # Schedule from now rather than from the missed slot so a long stall does not cause a burst
+            task.next_run += task.interval
+            if task.next_run <= current:
+                task.next_run = current + task.interval
+            with self._lock:
+                if task.running:
+                    task.skipped += 1
+                    TASK_SKIPPED.inc(task=task.name)
+                    print(f"Skipping task {task.name}: previous run still in progress")
+                    continue
+                task.running = True
+            self._executor.submit(self._run, task)
+
+    def run_forever(self, poll_interval: float = 1.0):
+        while True:
+            self.run_pending()
+            time.sleep(poll_interval)  # Sleep to prevent busy-waiting
+
+    def status(self) -> List[Dict[str, Any]]:
+        return [task.status() for task in self.tasks]
+
+    def shutdown(self, wait: bool = True):
+        self._executor.shutdown(wait=wait)
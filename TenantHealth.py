@@ -0,0 +1,111 @@
+import threading
+from typing import Dict, Optional
+
+from MySQLWriter import MySQLConnectionPool
+
+# Overview table -> (health column prefix, overview counter -> health column); the first counter is the successful one
+HEALTH_SOURCES = {
+    "transactions_overview": ("transactions", {
+        "countSuccessful": "transactions_successful",
+        "countBusinessExceptions": "transactions_business_exceptions",
+        "countApplicationExceptions": "transactions_application_exceptions",
+    }),
+    "completed_jobs_overview": ("jobs", {
+        "countSuccessful": "jobs_successful",
+        "countErrors": "jobs_errors",
+        "countStopped": "jobs_stopped",
+    }),
+}
+
+
+def success_rate(successful, failures) -> Optional[float]:
+    """
+    Successful share of all finished items in percent, or None when nothing finished.
+    """
+    counts = [successful] + list(failures)
+    if any(count is None for count in counts):
+        return None
+    total = sum(counts)
+    return successful * 100.0 / total if total else None
+
+
+class TenantHealth:
+    """
+    One row per tenant in a central `tenant_health_latest` table, holding the latest overview
+    counters and success rates of every tenant this collector scrapes.
+
+    Alert rules read this one small table instead of sorting each tenant's overview history,
+    so their cost no longer grows with history size, and a tenant added to the registry shows
+    up on its first realtime cycle without editing any query.
+    """
+    def __init__(self, pool: MySQLConnectionPool, database: str, table_name: str = "tenant_health_latest"):
+        self.pool = pool
+        self.database = database
+        self.table_name = table_name
+        self._created = False
+        self._lock = threading.Lock()
+
+    @property
+    def _table(self) -> str:
+        return f"`{self.database}`.`{self.table_name}`"
+
+    def _create(self, cursor):
+        with self._lock:
+            if self._created:
+                return
+            cursor.execute(f"CREATE DATABASE IF NOT EXISTS `{self.database}`")
+            cursor.execute(f"""
+                CREATE TABLE IF NOT EXISTS {self._table} (
+                    schema_name VARCHAR(64) NOT NULL PRIMARY KEY,
+                    tenant_name VARCHAR(255),
+                    transactions_successful BIGINT,
+                    transactions_business_exceptions BIGINT,
+                    transactions_application_exceptions BIGINT,
+                    transactions_success_rate DOUBLE,
+                    transactions_updated_at DATETIME(3),
+                    jobs_successful BIGINT,
+                    jobs_errors BIGINT,
+                    jobs_stopped BIGINT,
+                    jobs_success_rate DOUBLE,
+                    jobs_updated_at DATETIME(3),
+                    updated_at DATETIME(3) NOT NULL
+                )
+            """)
+            self._created = True
+
+    def update(self, schema_name: str, tenant_name: str, values: Dict) -> int:
+        """
+        Upsert a tenant's row. Only the given columns are overwritten, so a tenant whose job
+        counters could not be fetched keeps its last known job figures. updated_at is set on
+        every update, which lets a staleness alert catch a tenant that stopped reporting.
+
+        :param schema_name: The tenant's schema, the row key.
+        :param tenant_name: Display name used as the alert label.
+        :param values: Health columns to set, e.g. from overview_values().
+        :return: The number of rows affected as reported by MySQL.
+        """
+        columns = ["schema_name", "tenant_name"] + list(values)
+        column_list = ", ".join(f"`{column}`" for column in columns)
+        placeholders = ", ".join(["%s"] * len(columns))
+        updates = ", ".join(f"`{column}` = VALUES(`{column}`)" for column in columns[1:])
+        query = (f"INSERT INTO {self._table} ({column_list}, `updated_at`) VALUES ({placeholders}, NOW(3)) "
+                 f"ON DUPLICATE KEY UPDATE {updates}, `updated_at` = NOW(3)")
+
+        with self.pool.connection() as connection:
+            with connection.cursor() as cursor:
+                self._create(cursor)
+                affected = cursor.execute(query, [schema_name, tenant_name] + list(values.values()))
+            connection.commit()
+        return affected
+
+
+def overview_values(table_name: str, counters: Dict, as_of) -> Dict:
+    """
+    Health columns for one overview snapshot: its counters, success rate and when it was fetched.
+    """
+    prefix, columns = HEALTH_SOURCES[table_name]
+    counts = [counters.get(counter) for counter in columns]
+    values = {column: count for column, count in zip(columns.values(), counts)}
+    values[f"{prefix}_success_rate"] = success_rate(counts[0], counts[1:])
+    values[f"{prefix}_updated_at"] = as_of
+    return values
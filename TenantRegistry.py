@@ -0,0 +1,65 @@
+import json
+import os
+from typing import Dict, List
+
+REQUIRED_FIELDS = ["organisation", "tenant", "client_id", "refresh_token"]
+
+
+def load_tenants(path: str = None) -> List[Dict]:
+    """
+    Load the tenants this collector scrapes.
+
+    The registry is a JSON list, one object per tenant:
+
+        [
+            {
+                "name": "Aspenhealthcare",
+                "organisation": "aspenhealthcare",
+                "tenant": "DefaultTenant",
+                "client_id": "...",
+                "refresh_token_env": "ASPEN_REFRESH_TOKEN",
+                "schema_name": "aspenhealthcare_DB",
+                "max_in_flight": 4
+            }
+        ]
+
+    Secrets can be given inline ("refresh_token") or read from the environment variable
+    named by "refresh_token_env". schema_name defaults to the organisation and
+    max_in_flight caps the concurrent Orchestrator requests for that tenant.
+
+    Without a registry file the single tenant described by the ORGANISATION, TENANT,
+    CLIENT_ID, REFRESH_TOKEN and SCHEMA_NAME environment variables is returned.
+
+    :param path: Registry file, defaults to the TENANTS_FILE environment variable.
+    :return: A list of tenant dictionaries with all fields filled in.
+    """
+    path = path or os.getenv("TENANTS_FILE")
+    if path:
+        with open(path) as registry_file:
+            entries = json.load(registry_file)
+    else:
+        entries = [{
+            "organisation": os.getenv("ORGANISATION"),
+            "tenant": os.getenv("TENANT"),
+            "client_id": os.getenv("CLIENT_ID"),
+            "refresh_token": os.getenv("REFRESH_TOKEN"),
+            "schema_name": os.getenv("SCHEMA_NAME"),
+        }]
+
+    default_in_flight = int(os.getenv("MAX_IN_FLIGHT", 8))
+    tenants = []
+    for entry in entries:
+        tenant = dict(entry)
+        if not tenant.get("refresh_token") and tenant.get("refresh_token_env"):
+            tenant["refresh_token"] = os.getenv(tenant["refresh_token_env"])
+
+        missing = [field for field in REQUIRED_FIELDS if not tenant.get(field)]
+        if missing:
+            print(f"Skipping tenant {tenant.get('name') or tenant.get('organisation')}: missing {', '.join(missing)}")
+            continue
+
+        tenant["schema_name"] = tenant.get("schema_name") or tenant["organisation"]
+        tenant["name"] = tenant.get("name") or tenant["schema_name"]
+        tenant["max_in_flight"] = int(tenant.get("max_in_flight") or default_in_flight)
+        tenants.append(tenant)
+    return tenants
@@ -1,106 +1,44 @@
-Queue Success Rate alert query
-This shows how to chain queries, each resulting row in the table is going to be evaluated against the threshold set.
-We also provide a field in the resuling table with a meaningful label for the db we are querying which can be referenced in alert payloads
-
-An example of how to reference the db_name label: "Grafana alert for {{ index $labels "db_name" }}"
-
-(SELECT 
-    'Aspenhealthcare' AS db_name,
-    (countSuccessful * 1.0 / (countSuccessful + countBusinessExceptions + countApplicationExceptions) * 100) AS success_rate_percentage
-FROM 
-    aspenhealthcare_DB.transactions_overview
-ORDER BY date_queried DESC
-LIMIT 1 )
-
-UNION
-
-(SELECT 
-    'Italtile' AS db_name,
-    (countSuccessful * 1.0 / (countSuccessful + countBusinessExceptions + countApplicationExceptions) * 100) AS success_rate_percentage
-FROM 
-    italtile_DB.transactions_overview
-ORDER BY date_queried DESC
-LIMIT 1 )
-
-UNION
+Alert queries
 
-(SELECT 
-    'Afgri Prod' AS db_name,
-    (countSuccessful * 1.0 / (countSuccessful + countBusinessExceptions + countApplicationExceptions) * 100) AS success_rate_percentage
-FROM 
-    afgriprod_DB.transactions_overview
-ORDER BY date_queried DESC
-LIMIT 1 )
+Every realtime cycle the collector upserts one row per tenant into global.tenant_health_latest (the schema is set
+with HEALTH_SCHEMA), holding the latest transaction and job counters and their success rates. Alert rules read that
+one table, so each tenant is a row of the result and new tenants are picked up without editing the queries.
+Each resulting row is evaluated against the threshold set. The db_name field gives a meaningful label for the
+tenant which can be referenced in alert payloads.
 
-UNION
-
-(SELECT 
-    'Intellicomms' AS db_name,
-    (countSuccessful * 1.0 / (countSuccessful + countBusinessExceptions + countApplicationExceptions) * 100) AS success_rate_percentage
-FROM 
-    plpljaakhz_DB.transactions_overview
-ORDER BY date_queried DESC
-LIMIT 1 )
-
-UNION
-
-(SELECT 
-    'Tangent Production' AS db_name,
-    (countSuccessful * 1.0 / (countSuccessful + countBusinessExceptions + countApplicationExceptions) * 100) AS success_rate_percentage
-FROM 
-    tangentsolutionsproduction_DB.transactions_overview
-ORDER BY date_queried DESC
-LIMIT 1 );
+An example of how to reference the db_name label: "Grafana alert for {{ index $labels "db_name" }}"
 
 ######################################################################################################################
 
 
-Job alert queries
+Queue Success Rate alert query
 
-(SELECT 
-    'Italtile' AS db_name,
-    ((countSuccessful * 1.0) / (countSuccessful + countStopped + countErrors) * 100) AS success_rate_percentage
-FROM 
-    italtile_DB.completed_jobs_overview
-ORDER BY date_queried DESC
-LIMIT 1 )
+SELECT
+    tenant_name AS db_name,
+    transactions_success_rate AS success_rate_percentage
+FROM
+    global.tenant_health_latest
+WHERE transactions_success_rate IS NOT NULL;
 
-UNION
+######################################################################################################################
 
-(SELECT  
-    'Aspenhealthcare' AS db_name,
-    ((countSuccessful * 1.0) / (countSuccessful + countStopped + countErrors) * 100) AS success_rate_percentage
-FROM 
-    aspenhealthcare_DB.completed_jobs_overview
-ORDER BY date_queried DESC
-LIMIT 1 )
 
-UNION
+Job alert query
 
-(SELECT 
-    'Afgri Prod' AS db_name,
-    ((countSuccessful * 1.0) / (countSuccessful + countStopped + countErrors) * 100) AS success_rate_percentage
-FROM 
-    afgriprod_DB.completed_jobs_overview
-ORDER BY date_queried DESC
-LIMIT 1 )
+SELECT
+    tenant_name AS db_name,
+    jobs_success_rate AS success_rate_percentage
+FROM
+    global.tenant_health_latest
+WHERE jobs_success_rate IS NOT NULL;
 
-UNION
+######################################################################################################################
 
-(SELECT 
-    'Intellicomms' AS db_name,
-    ((countSuccessful * 1.0) / (countSuccessful + countStopped + countErrors) * 100) AS success_rate_percentage
-FROM 
-    plpljaakhz_DB.completed_jobs_overview
-ORDER BY date_queried DESC
-LIMIT 1 )
 
-UNION
+Stale tenant alert query (minutes since the tenant last reported; alert above a few realtime intervals)
 
-(SELECT 
-    'Tangent Production' AS db_name,
-    ((countSuccessful * 1.0) / (countSuccessful + countStopped + countErrors) * 100) AS success_rate_percentage
-FROM 
-    tangentsolutionsproduction_DB.completed_jobs_overview
-ORDER BY date_queried DESC
-LIMIT 1 );
+SELECT
+    tenant_name AS db_name,
+    TIMESTAMPDIFF(MINUTE, updated_at, NOW(3)) AS minutes_since_update
+FROM
+    global.tenant_health_latest;
@@ -0,0 +1,139 @@
+"""
+Runs one full collector cycle (every timeseries and realtime inserter) against the replay
+server and reports per-method latency, API requests and rows written.
+
+The database is an in-process stand-in: every statement is accepted and counted, so the run
+includes the whole write path (type inference, value conversion, batching) without needing a
+MySQL server, and the numbers isolate the collector from database speed. Examples:
+    python bench_cycle.py --folders 20 --queues 40 --latency-ms 30
+    python bench_cycle.py --recording recording.jsonl --max-in-flight 8
+    python bench_cycle.py --queues 10000 --latency-ms 100 --db-latency-ms 50 --workers 8
+"""
+import argparse
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+
+from main import REALTIME_TASKS, TIMESERIES_TASKS
+from OrchestratorDataInserter import OrchestratorDataInserter
+from OrchestratorTenantClient import OrchestratorTenantClient
+from replay_server import start_replay_server
+
+
+class NullCursor:
+    def __init__(self, counts, latency):
+        self.counts = counts
+        self.latency = latency
+        self.rowcount = 0
+
+    def execute(self, query, args=None):
+        self.counts["statements"] += 1
+        return 0
+
+    def executemany(self, query, args):
+        time.sleep(self.latency)
+        self.counts["statements"] += 1
+        self.counts["rows"] += len(args)
+        return len(args)
+
+    def fetchall(self):
+        return ()
+
+    def fetchone(self):
+        return None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+class NullConnection:
+    def __init__(self, counts, latency):
+        self.counts = counts
+        self.latency = latency
+
+    def cursor(self):
+        return NullCursor(self.counts, self.latency)
+
+    def commit(self):
+        self.counts["commits"] += 1
+
+    def rollback(self):
+        pass
+
+
+class NullPool:
+    """
+    Stands in for MySQLConnectionPool: hands out connections that count statements, rows and commits.
+    Every batched insert takes `latency` seconds, to stand in for a MySQL round trip.
+    """
+    def __init__(self, latency: float = 0.0):
+        self.counts = {"statements": 0, "rows": 0, "commits": 0}
+        self.latency = latency
+
+    @contextmanager
+    def connection(self):
+        yield NullConnection(self.counts, self.latency)
+
+    def close(self):
+        pass
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--recording", help="JSONL file written by ResponseRecorder")
+    parser.add_argument("--folders", type=int, help="synthetic folder count (default: recorded, or 10)")
+    parser.add_argument("--queues", type=int, help="synthetic queue count")
+    parser.add_argument("--latency-ms", type=float, default=20.0)
+    parser.add_argument("--max-in-flight", type=int, default=8)
+    parser.add_argument("--db-latency-ms", type=float, default=0.0, help="time taken by every batched insert")
+    parser.add_argument("--workers", type=int, default=1, help="inserters run side by side, as TASK_WORKERS does")
+    parser.add_argument("--pipeline-depth", type=int, default=2)
+    args = parser.parse_args()
+
+    server = start_replay_server(args.recording, args.folders, args.queues, args.latency_ms)
+    url = f"http://127.0.0.1:{server.server_address[1]}/"
+
+    started = time.perf_counter()
+    client = OrchestratorTenantClient("org", "tenant", "client", "token", max_in_flight=args.max_in_flight,
+                                      base_url=url, auth_url=url + "oauth/token")
+    pool = NullPool(args.db_latency_ms / 1000.0)
+    inserter = OrchestratorDataInserter(client, "user", "password", "localhost", "bench_DB", pool=pool,
+                                        pipeline_depth=args.pipeline_depth)
+    setup_seconds = time.perf_counter() - started
+
+    def run(task_name):
+        rows_before = pool.counts["rows"]
+        task_started = time.perf_counter()
+        result = getattr(inserter, task_name)()
+        # Rows are only attributed to one task when tasks run one at a time
+        rows = pool.counts["rows"] - rows_before if args.workers == 1 else "-"
+        return task_name, time.perf_counter() - task_started, result, rows
+
+    cycle_started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.workers) as executor:
+        results = list(executor.map(run, TIMESERIES_TASKS + REALTIME_TASKS))
+    cycle_seconds = time.perf_counter() - cycle_started
+    server.shutdown()
+
+    print()
+    print(f"{'method':<36} {'seconds':>8} {'result':>8} {'db rows':>8}")
+    for task_name, seconds, result, rows in results:
+        print(f"{task_name:<36} {seconds:>8.3f} {str(result):>8} {rows:>8}")
+
+    stats = client.get_endpoint_stats()
+    print()
+    print(f"{'endpoint':<60} {'requests':>8} {'avg ms':>8}")
+    for endpoint, endpoint_stats in sorted(stats.items()):
+        print(f"{endpoint[:60]:<60} {endpoint_stats['requests']:>8.0f} {endpoint_stats['avg_seconds'] * 1000:>8.1f}")
+
+    print()
+    print(f"setup {setup_seconds:.3f}s, cycle {cycle_seconds:.3f}s, "
+          f"{sum(s['requests'] for s in stats.values()):.0f} requests, "
+          f"{pool.counts['rows']} rows in {pool.counts['statements']} statements, {pool.counts['commits']} commits")
+
+
+if __name__ == "__main__":
+    main()
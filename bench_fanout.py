@@ -0,0 +1,167 @@
+"""
+Measures how the per-folder and per-queue Orchestrator calls scale with folder count.
+
+A mock Orchestrator is served from a local ThreadingHTTPServer with a fixed per-request
+latency, and the same sweep is timed sequentially (max_in_flight=1) and with the
+bounded thread pool. Example:
+    python bench_fanout.py --folders 10 50 100 200 --latency-ms 40 --max-in-flight 16
+"""
+import argparse
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+from OrchestratorTenantClient import OrchestratorTenantClient
+
+
+class MockOrchestratorHandler(BaseHTTPRequestHandler):
+    """
+    Answers the Orchestrator endpoints the collector reads with small synthetic payloads.
+    Folder and queue counts and latency are read from the server object.
+    """
+    protocol_version = "HTTP/1.1"
+    # headers and body go out as separate writes; without this, keep-alive hits delayed-ACK stalls
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send(self, payload, status=200):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _payload(self):
+        server = self.server
+        path = self.path
+        folder_id = self.headers.get("X-UIPATH-OrganizationUnitId", "0")
+
+        if "oauth/token" in path:
+            return {"access_token": "mock-token", "expires_in": 3600}
+        if "odata/Folders" in path:
+            return {"value": [{"Id": i, "DisplayName": f"Folder {i}"} for i in range(1, server.folders + 1)]}
+        if "RetrieveLastDaysProcessingRecords" in path:
+            return {"value": [{"Id": 1, "TenantId": 1, "QueueDefinitionId": 1, "ReportType": "Day",
+                               "NumberOfSuccessfulTransactions": 5, "ProcessingTime": "2024-01-01T00:00:00Z"}]}
+        if "ListQueues" in path:
+            return {"@odata.count": 2, "value": [
+                {"QueueDefinitionName": f"Queue {folder_id}-{n}", "SuccessfulTransactionsNo": 1,
+                 "ApplicationExceptionsNo": 0, "BusinessExceptionsNo": 0} for n in range(2)]}
+        if "odata/QueueDefinitions" in path:
+            return {"value": [{"Id": i, "Name": f"Queue {i}"} for i in range(1, server.queues + 1)]}
+        if "GetByKey" in path:
+            return {"Info": "System.Exception: mock fault " * 20}
+        if "odata/Jobs" in path:
+            return {"@odata.count": 1, "value": [
+                {"Key": f"job-{folder_id}", "ReleaseName": "Process", "OrganizationUnitFullyQualifiedName": f"Folder {folder_id}",
+                 "HostMachineName": "machine", "StartTime": "2024-01-01T00:00:00Z", "EndTime": "2024-01-01T00:01:00Z",
+                 "CreationTime": "2024-01-01T00:00:00Z", "Info": "System.Exception: mock fault " * 20}]}
+        if "odata/ProcessSchedules" in path:
+            return {"@odata.count": 1, "value": [{"Name": f"Trigger {folder_id}", "Enabled": False}]}
+        return self._monitoring_payload(path)
+
+    def _monitoring_payload(self, path):
+        # Tenant-wide monitoring endpoints read by the realtime and timeseries inserters
+        server = self.server
+        query = parse_qs(urlsplit(path).query)
+        if "GetQueuesTable" in path or "GetProcessesTable" in path:
+            page_no = int(query.get("pageNo", ["1"])[0])
+            page_size = int(query.get("pageSize", ["1000"])[0])
+            if "GetQueuesTable" in path:
+                rows = [{"queueId": i, "queueName": f"Queue {i}", "itemsToProcess": i % 7, "itemsInProgress": i % 3,
+                         "slaInfo": {"hasSla": i % 2 == 0, "itemsAtRisk": i % 4}} for i in range(1, server.queues + 1)]
+            else:
+                rows = [{"processId": i, "processName": f"Process {i}", "folderName": f"Folder {i % server.folders + 1}",
+                         "countSuccessful": i % 11, "countErrors": i % 5, "countStopped": i % 2} for i in range(1, server.folders + 1)]
+            return {"data": rows[(page_no - 1) * page_size:page_no * page_size], "totalCount": len(rows)}
+        if "Evolution" in path:
+            points = [f"2024-01-01T{hour:02d}:00:00Z" for hour in range(24)]
+            if "GetProcessedItemsEvolution" in path:
+                return [{"pointInTime": point, "countSuccessful": 10, "countBusinessExceptions": 1,
+                         "countApplicationExceptions": 2, "countAbandoned": 0} for point in points]
+            if "GetFinishedJobsEvolution" in path:
+                return [{"pointInTime": point, "countSuccessful": 4, "countErrors": 1, "countStopped": 0} for point in points]
+            return [{"pointInTime": point, "countExecuting": 3} for point in points]
+        if "GetUnprocessedItemsCounts" in path:
+            return {"countNew": 12, "countInProgress": 3}
+        if "GetProcessedItemsCounts" in path:
+            return {"countSuccessful": 240, "countBusinessExceptions": 24, "countApplicationExceptions": 48}
+        if "GetFinishedJobsCounts" in path:
+            return {"countSuccessful": 96, "countErrors": 24, "countStopped": 0}
+        if "GetJobsCounts" in path:
+            return {"countPending": 2, "countRunning": 3, "countStopping": 0, "countSuspended": 0}
+        if "GetJobsStats" in path:
+            return [{"title": title, "count": count} for title, count in
+                    (("Successful", 96), ("Faulted", 24), ("Stopped", 0), ("Running", 3), ("Pending", 2))]
+        if "GetMachineSessionRuntimes" in path:
+            return {"value": [{"MachineName": f"machine-{i}", "MaintenanceMode": "Default", "Status": "Available"}
+                              for i in range(1, 4)]}
+        return None
+
+    def do_GET(self):
+        # drain any request body so the kept-alive connection stays in sync
+        length = int(self.headers.get("Content-Length") or 0)
+        if length:
+            self.rfile.read(length)
+        time.sleep(self.server.latency)
+        payload = self._payload()
+        if payload is None:
+            self._send({"message": "not found"}, status=404)
+        else:
+            self._send(payload)
+
+    do_POST = do_GET
+
+
+class MockOrchestratorServer(ThreadingHTTPServer):
+    daemon_threads = True
+    # the default listen backlog of 5 drops connections under a concurrent sweep
+    request_queue_size = 256
+
+
+def start_mock_server(folders: int, queues: int, latency_ms: float) -> ThreadingHTTPServer:
+    server = MockOrchestratorServer(("127.0.0.1", 0), MockOrchestratorHandler)
+    server.folders = folders
+    server.queues = queues
+    server.latency = latency_ms / 1000.0
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def time_sweep(client: OrchestratorTenantClient) -> float:
+    started = time.perf_counter()
+    client.get_queue_processing_records()
+    client.get_faulted_jobs()
+    client.get_disabled_triggers()
+    client.get_queue_data()
+    return time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--folders", type=int, nargs="+", default=[10, 50, 100])
+    parser.add_argument("--queues-per-folder", type=float, default=1.0)
+    parser.add_argument("--latency-ms", type=float, default=20.0)
+    parser.add_argument("--max-in-flight", type=int, default=16)
+    args = parser.parse_args()
+
+    print(f"{'folders':>8} {'sequential (s)':>15} {'concurrent (s)':>15} {'speedup':>8}")
+    for folders in args.folders:
+        server = start_mock_server(folders, max(1, int(folders * args.queues_per_folder)), args.latency_ms)
+        url = f"http://127.0.0.1:{server.server_address[1]}/"
+        timings = []
+        for max_in_flight in (1, args.max_in_flight):
+            client = OrchestratorTenantClient("org", "tenant", "client", "token", max_in_flight=max_in_flight,
+                                              base_url=url, auth_url=url + "oauth/token")
+            timings.append(time_sweep(client))
+        server.shutdown()
+        print(f"{folders:>8} {timings[0]:>15.2f} {timings[1]:>15.2f} {timings[0] / timings[1]:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""
+Compares the old pandas json_normalize + concat path with the columnar RecordBatch path,
+from API payload to the row tuples handed to MySQLWriter.
+
+Runs on synthetic GetQueuesTable-shaped records by default, or on a recorded payload:
+    python bench_flatten.py --records 5000
+    python bench_flatten.py --payload queues_page.json
+
+A payload file is either a list of records or a response object with a "data" or "value" list.
+CPU time is measured with time.process_time() and peak memory with tracemalloc.
+pandas is no longer a collector dependency; install it separately to run this benchmark.
+"""
+import argparse
+import gc
+import json
+import time
+import tracemalloc
+
+from RecordBatch import RecordBatch
+
+
+def make_records(count):
+    return [
+        {
+            "queueId": i,
+            "queueName": f"Queue_{i % 50}",
+            "folderName": f"Shared/Folder_{i % 7}",
+            "itemsToProcess": i % 97,
+            "itemsInProgress": i % 5,
+            "averageProcessingTime": i * 1.5 if i % 11 else None,
+            "slaInfo": {"hasSla": bool(i % 2), "itemsAtRisk": i % 3, "sla": {"minutes": 60}},
+            "tags": ["a", "b"],
+        }
+        for i in range(count)
+    ]
+
+
+def load_payload(path):
+    with open(path) as payload_file:
+        payload = json.load(payload_file)
+    if isinstance(payload, dict):
+        payload = payload.get("data") or payload.get("value") or [payload]
+    return payload
+
+
+def pandas_path(records):
+    # Mirrors the previous insert_queue_details_table: one DataFrame per record, then concat
+    import pandas as pd
+    frames = [pd.json_normalize(record).fillna("N/A") for record in records]
+    df = pd.concat(frames, axis=0)
+    return list(df.itertuples(index=False, name=None))
+
+
+def columnar_path(records):
+    batch = RecordBatch.from_records(records).fillna("N/A")
+    return list(batch.rows())
+
+
+def measure(func, records, repeat):
+    gc.collect()
+    started = time.process_time()
+    for _ in range(repeat):
+        rows = func(records)
+    cpu = (time.process_time() - started) / repeat
+
+    gc.collect()
+    tracemalloc.start()
+    func(records)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return cpu, peak, len(rows)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--records", type=int, default=2000)
+    parser.add_argument("--payload", help="JSON file with recorded API records")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    records = load_payload(args.payload) if args.payload else make_records(args.records)
+
+    # Time the pandas import separately; it is paid once per process, not per payload
+    started = time.perf_counter()
+    import pandas  # noqa: F401
+    import_seconds = time.perf_counter() - started
+
+    pandas_cpu, pandas_peak, pandas_rows = measure(pandas_path, records, args.repeat)
+    columnar_cpu, columnar_peak, columnar_rows = measure(columnar_path, records, args.repeat)
+
+    print(f"records={len(records)} repeat={args.repeat} pandas import={import_seconds:.3f}s")
+    print(f"pandas  : {pandas_cpu * 1000:9.1f} ms cpu  {pandas_peak / 1024 / 1024:8.2f} MiB peak  {pandas_rows} rows")
+    print(f"columnar: {columnar_cpu * 1000:9.1f} ms cpu  {columnar_peak / 1024 / 1024:8.2f} MiB peak  {columnar_rows} rows")
+    print(f"speedup : {pandas_cpu / columnar_cpu:.1f}x cpu, {pandas_peak / max(columnar_peak, 1):.1f}x less peak memory")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""
+Compares the old row-by-row INSERT path with the pooled, batched MySQLWriter.
+
+Point it at a local MySQL stand-in, e.g.
+    docker run -d -e MYSQL_ROOT_PASSWORD=bench -p 3306:3306 mysql:latest
+    DB_HOST=127.0.0.1 DB_USER=root DB_PASSWORD=bench python bench_mysql_writer.py --rows 20000
+"""
+import argparse
+import os
+import time
+
+import pymysql
+
+from MySQLWriter import MySQLConnectionPool, MySQLWriter
+
+
+def make_rows(count):
+    columns = ["Name", "NumberOfSuccessfulTransactions", "NumberOfAppExceptions", "ProcessingTime", "date_queried"]
+    rows = [(f"Queue_{i % 50}", str(i % 97), str(i % 13), f"{i * 1.5:.1f}", "2024-01-01T00:00:00Z") for i in range(count)]
+    return columns, rows
+
+
+def legacy_write(columns, rows, table_name, host, user, password, database, calls):
+    # Mirrors the original utils.write_df_to_mysql: one connection per call and one execute per row
+    per_call = max(1, len(rows) // calls)
+    for start in range(0, len(rows), per_call):
+        connection = pymysql.connect(host=host, user=user, password=password, database=database)
+        cursor = connection.cursor()
+        cursor.execute(f"CREATE TABLE IF NOT EXISTS {table_name} ({', '.join(f'{c} VARCHAR(255)' for c in columns)})")
+        insert_query = f"INSERT INTO {table_name} ({', '.join(columns)}) VALUES ({', '.join(['%s'] * len(columns))})"
+        for row in rows[start:start + per_call]:
+            cursor.execute(insert_query, row)
+        connection.commit()
+        cursor.close()
+        connection.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=10000)
+    parser.add_argument("--calls", type=int, default=50, help="number of write calls the legacy path is split into")
+    parser.add_argument("--batch-size", type=int, default=500)
+    parser.add_argument("--database", default="writer_bench_DB")
+    args = parser.parse_args()
+
+    host = os.getenv("DB_HOST", "127.0.0.1")
+    user = os.getenv("DB_USER", "root")
+    password = os.getenv("DB_PASSWORD", "")
+
+    pool = MySQLConnectionPool(host=host, user=user, password=password)
+    with pool.connection() as connection:
+        with connection.cursor() as cursor:
+            cursor.execute(f"DROP DATABASE IF EXISTS `{args.database}`")
+            cursor.execute(f"CREATE DATABASE `{args.database}`")
+        connection.commit()
+
+    columns, rows = make_rows(args.rows)
+
+    started = time.perf_counter()
+    legacy_write(columns, rows, "legacy_rows", host, user, password, args.database, args.calls)
+    legacy_seconds = time.perf_counter() - started
+
+    writer = MySQLWriter(pool, args.database, batch_size=args.batch_size)
+    per_call = max(1, len(rows) // args.calls)
+    started = time.perf_counter()
+    for start in range(0, len(rows), per_call):
+        writer.write_rows("batched_rows", columns, rows[start:start + per_call])
+    batched_seconds = time.perf_counter() - started
+
+    print()
+    print(f"rows={args.rows} calls={args.calls} batch_size={args.batch_size}")
+    print(f"legacy : {legacy_seconds:8.3f}s  {args.rows / legacy_seconds:10.0f} rows/s")
+    print(f"batched: {batched_seconds:8.3f}s  {args.rows / batched_seconds:10.0f} rows/s")
+    print(f"speedup: {legacy_seconds / batched_seconds:.1f}x")
+    pool.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -28,6 +28,12 @@ docker run -d \
   -e TIMESERIES_INTERVAL="" \
   -e REALTIME_INTERVAL="" \
   -e SCHEMA_NAME="" \
+  -e TENANTS_FILE="" \
+  -e SPOOL_DIR="/app/spool" \
+  -e RETENTION_DAYS="90" \
+  -e ARCHIVE_DIR="/app/archive" \
+  -v orch_api_spool:/app/spool \
+  -v orch_api_archive:/app/archive \
   --name "$CONTAINER_NAME" "$IMAGE_NAME"
 
 echo "Docker container $CONTAINER_NAME started successfully."
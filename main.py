@@ -1,71 +1,101 @@
-from OrchestratorTenantClient import OrchestratorTenantClient
-from OrchestratorDataInserter import OrchestratorDataInserter
-import os
 import time
-import schedule
-
-
-def timeseriesdata(host, user, password):
-
-    client = OrchestratorTenantClient(
-        organisation=os.getenv('ORGANISATION'),
-        tenant=os.getenv('TENANT'),
-        client_id=os.getenv('CLIENT_ID'),
-        refresh_token=os.getenv('REFRESH_TOKEN')
-    )
-
-    # Determine database name
-    db_name = os.getenv("SCHEMA_NAME", client.organisation)
-
-    # Initialize OrchestratorDataInserter
-    inserter = OrchestratorDataInserter(client=client, db_user=user, db_pass=password, db_host=host, db_name=db_name)
-
-    # Insert records
-    try:
-        inserter.insert_queue_processing_records()
-        inserter.insert_transactions_timeline()
-        inserter.insert_completed_jobs_timeline()
-        inserter.insert_completed_jobs_timeframe()
-        
-    except Exception as e:
-        print(f"Error in majordata: {e}")
-
-def realtimestats(host, user, password):
+# Taken before the other imports so the startup report includes them
+PROCESS_STARTED = time.perf_counter()
 
-    client = OrchestratorTenantClient(
-        organisation=os.getenv('ORGANISATION'),
-        tenant=os.getenv('TENANT'),
-        client_id=os.getenv('CLIENT_ID'),
-        refresh_token=os.getenv('REFRESH_TOKEN')
-    )
-
-
-    # Determine database name
-    db_name = os.getenv("SCHEMA_NAME", client.organisation)
-
-    # Initialize OrchestratorDataInserter
-    inserter = OrchestratorDataInserter(client=client, db_user=user, db_pass=password, db_host=host, db_name=db_name)
-
-    # Insert records
-    try:
-        inserter.insert_transactions_overview()
-        inserter.insert_completed_jobs_overview()
-        inserter.insert_unprocessed_items()
-        inserter.insert_triggered_job_states()
-        inserter.insert_process_details_table()
-        inserter.insert_queue_details_table()
-        inserter.insert_queue_data()
-        inserter.insert_maintenance_mode_status()
-        inserter.insert_disabled_triggers()
-        inserter.insert_job_stats()
-        inserter.insert_faulted_jobs()
-               
-    except Exception as e:
-        print(f"Error in realtimestats: {e}")
+from OrchestratorTenantClient import OrchestratorTenantClient
+from OrchestratorDataInserter import HISTORY_TABLES, OrchestratorDataInserter
+from MySQLWriter import MySQLConnectionPool
+from TenantRegistry import load_tenants
+from TaskScheduler import TaskScheduler
+from TenantHealth import TenantHealth
+from ResponseRecorder import ResponseRecorder
+from metrics import start_metrics_server
+import os
 
+# Inserters refreshed on the timeseries interval
+TIMESERIES_TASKS = [
+    "insert_queue_processing_records",
+    "insert_transactions_timeline",
+    "insert_completed_jobs_timeline",
+    "insert_completed_jobs_timeframe",
+    "maintain_history_tables",
+    "archive_history_tables",
+]
+
+# Inserters refreshed on the real-time interval
+REALTIME_TASKS = [
+    "insert_transactions_overview",
+    "insert_completed_jobs_overview",
+    "insert_unprocessed_items",
+    "insert_triggered_job_states",
+    "insert_process_details_table",
+    "insert_queue_details_table",
+    "insert_queue_data",
+    "insert_maintenance_mode_status",
+    "insert_disabled_triggers",
+    "insert_job_stats",
+    "insert_faulted_jobs",
+]
+
+
+def task_interval(task_name, default):
+    # Any task can be given its own interval, e.g. INTERVAL_INSERT_JOB_STATS=60
+    return int(os.getenv(f"INTERVAL_{task_name.upper()}", default))
+
+
+def spool_options():
+    return {
+        "max_bytes": int(float(os.getenv('SPOOL_MAX_MB', 512)) * 1024 * 1024),
+        "max_age": float(os.getenv('SPOOL_MAX_AGE_HOURS', 24)) * 3600,
+        "flush_interval": float(os.getenv('SPOOL_FLUSH_INTERVAL', 5)),
+    }
+
+
+def retention_days():
+    # RETENTION_DAYS applies to every history table, RETENTION_DAYS_FAULTED_JOBS etc. override it; 0 keeps everything
+    default = os.getenv('RETENTION_DAYS', 0)
+    return {table_name: int(os.getenv(f"RETENTION_DAYS_{table_name.upper()}", default)) for table_name in HISTORY_TABLES}
+
+
+def build_inserters(tenants, host, user, password, pool, session, metadata_ttl, spool_dir=None, health=None):
+    inserters = []
+    for tenant in tenants:
+        try:
+            client = OrchestratorTenantClient(
+                organisation=tenant["organisation"],
+                tenant=tenant["tenant"],
+                client_id=tenant["client_id"],
+                refresh_token=tenant["refresh_token"],
+                max_in_flight=tenant["max_in_flight"],
+                session=session,
+                metadata_ttl=metadata_ttl
+            )
+            inserters.append(OrchestratorDataInserter(client=client, db_user=user, db_pass=password, db_host=host,
+                                                      db_name=tenant["schema_name"], pool=pool,
+                                                      spool_dir=spool_dir, spool_options=spool_options(),
+                                                      health=health, tenant_name=tenant["name"],
+                                                      retention_days=retention_days(),
+                                                      partition_days=int(os.getenv('PARTITION_DAYS', 1)),
+                                                      archive_dir=os.getenv('ARCHIVE_DIR'),
+                                                      archive_after_days=int(os.getenv('ARCHIVE_AFTER_DAYS', 30)),
+                                                      pipeline_depth=int(os.getenv('PIPELINE_DEPTH', 2))))
+        except Exception as e:
+            print(f"Error setting up tenant {tenant['name']}: {e}")
+    return inserters
+
+
+def startup_report(phases):
+    # phases is a list of (name, finished_at) in order, timed with time.perf_counter()
+    durations, previous = [], PROCESS_STARTED
+    for name, finished_at in phases:
+        durations.append(f"{name} {finished_at - previous:.3f}s")
+        previous = finished_at
+    return f"Startup took {previous - PROCESS_STARTED:.3f}s: " + ", ".join(durations)
 
 
 def main():
+    phases = [("imports", time.perf_counter())]
+
     # Read database connection details from environment variables
     host = os.getenv('DB_HOST', '')  # Default to localhost if not set
     user = os.getenv('DB_USER', '')       # Default to 'root' if not set
@@ -73,18 +103,58 @@ def main():
 
     # Read intervals from environment variables or use defaults
     timeseries_interval = int(os.getenv('TIMESERIES_INTERVAL', 21600))   # Default is 6 hours
-    realtimestats_interval = int(os.getenv('REALTIME_INTERVAL', 600))   # Default is 1 hour
-
-    # Schedule the timeseries data function
-    schedule.every(timeseries_interval).seconds.do(timeseriesdata, host, user, password)
-
-    # Schedule the real-time stats function
-    schedule.every(realtimestats_interval).seconds.do(realtimestats, host, user, password)
+    realtimestats_interval = int(os.getenv('REALTIME_INTERVAL', 600))   # Default is 10 minutes
+
+    # TENANTS_FILE lists every tenant to scrape; without it the single tenant from the environment is used
+    tenants = load_tenants()
+    phases.append(("tenant registry", time.perf_counter()))
+
+    # One connection pool for the lifetime of the process, shared by every tenant's inserter
+    pool = MySQLConnectionPool(host=host, user=user, password=password,
+                               pool_size=int(os.getenv('DB_POOL_SIZE', 4)))
+
+    # One keep-alive HTTP pool shared by every tenant's client
+    session = OrchestratorTenantClient.build_session(sum(tenant["max_in_flight"] for tenant in tenants))
+
+    # RECORD_FILE appends every API response to a JSONL recording that replay_server.py can serve
+    if os.getenv('RECORD_FILE'):
+        ResponseRecorder(os.getenv('RECORD_FILE')).attach(session)
+
+    # Every tenant's latest success rates go to one table in HEALTH_SCHEMA for alerting; empty turns it off
+    health_schema = os.getenv('HEALTH_SCHEMA', 'global')
+    health = TenantHealth(pool, health_schema) if health_schema else None
+
+    # Clients live as long as the process: tokens are refreshed before expiry
+    # and folder/queue metadata is cached for METADATA_TTL seconds between ticks
+    # SPOOL_DIR turns on the on-disk write spool: fetched data is kept there until MySQL has it
+    # ARCHIVE_DIR turns on the Parquet archive; keep ARCHIVE_AFTER_DAYS below RETENTION_DAYS or rows expire unarchived
+    inserters = build_inserters(tenants, host, user, password, pool, session,
+                                metadata_ttl=float(os.getenv('METADATA_TTL', 3600)),
+                                spool_dir=os.getenv('SPOOL_DIR'), health=health)
+    print(f"Collecting for {len(inserters)} tenant(s): {', '.join(i.db_name for i in inserters)}")
+    # No API call is made here: tokens and folder/queue metadata are fetched by the first task that needs them
+    phases.append(("inserters", time.perf_counter()))
+
+    # Every inserter of every tenant is its own task; independent tasks run side by side
+    # on the worker pool and a task that is still running is never started twice
+    scheduler = TaskScheduler(max_workers=int(os.getenv('TASK_WORKERS', 8)))
+    for inserter in inserters:
+        for task_name in TIMESERIES_TASKS:
+            scheduler.add(f"{inserter.db_name}.{task_name}", getattr(inserter, task_name),
+                          task_interval(task_name, timeseries_interval))
+        for task_name in REALTIME_TASKS:
+            scheduler.add(f"{inserter.db_name}.{task_name}", getattr(inserter, task_name),
+                          task_interval(task_name, realtimestats_interval))
+
+    # Expose /metrics for Prometheus; METRICS_PORT=0 turns it off
+    metrics_port = int(os.getenv('METRICS_PORT', 9108))
+    if metrics_port:
+        start_metrics_server(metrics_port)
+    phases.append(("scheduler", time.perf_counter()))
+    print(startup_report(phases))
 
     # Keep the scheduling running
-    while True:
-        schedule.run_pending()
-        time.sleep(1)  # Sleep to prevent busy-waiting
+    scheduler.run_forever()
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,193 @@
+"""
+Minimal Prometheus-style instrumentation for the collector.
+
+Metrics are kept in process and rendered in the Prometheus text exposition format
+by a small HTTP server (see start_metrics_server()), so no extra dependency is needed.
+"""
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Tuple
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0)
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(labels: Dict[str, str]) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape(value)}"' for key, value in labels.items()) + "}"
+
+
+class _Metric:
+    kind = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Tuple[str, ...] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        REGISTRY.append(self)
+
+    def _key(self, labels: Dict[str, str]) -> Tuple[str, ...]:
+        return tuple(str(labels.get(name, "")) for name in self.labelnames)
+
+    def _labels(self, key: Tuple[str, ...], **extra) -> Dict[str, str]:
+        labels = dict(zip(self.labelnames, key))
+        labels.update(extra)
+        return labels
+
+    def samples(self) -> List[str]:
+        raise NotImplementedError
+
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        lines += self.samples()
+        return "\n".join(lines)
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Tuple[str, ...] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1.0, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def samples(self) -> List[str]:
+        with self._lock:
+            items = list(self._values.items())
+        return [f"{self.name}{_format_labels(self._labels(key))} {value}" for key, value in items]
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def __init__(self, name: str, documentation: str, labelnames: Tuple[str, ...] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def set(self, value: float, **labels):
+        with self._lock:
+            self._values[self._key(labels)] = value
+
+    def set_to_current_time(self, **labels):
+        self.set(time.time(), **labels)
+
+    def samples(self) -> List[str]:
+        with self._lock:
+            items = list(self._values.items())
+        return [f"{self.name}{_format_labels(self._labels(key))} {value}" for key, value in items]
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Tuple[str, ...] = (), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # label key -> [bucket counts..., sum, count]
+        self._values: Dict[Tuple[str, ...], List[float]] = {}
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            state = self._values.setdefault(key, [0.0] * (len(self.buckets) + 2))
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    state[i] += 1
+            state[-2] += value
+            state[-1] += 1
+
+    @contextmanager
+    def time(self, **labels):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+    def samples(self) -> List[str]:
+        with self._lock:
+            items = [(key, list(state)) for key, state in self._values.items()]
+        lines = []
+        for key, state in items:
+            for bound, count in zip(self.buckets, state):
+                lines.append(f"{self.name}_bucket{_format_labels(self._labels(key, le=bound))} {count}")
+            lines.append(f"{self.name}_bucket{_format_labels(self._labels(key, le='+Inf'))} {state[-1]}")
+            lines.append(f"{self.name}_sum{_format_labels(self._labels(key))} {state[-2]}")
+            lines.append(f"{self.name}_count{_format_labels(self._labels(key))} {state[-1]}")
+        return lines
+
+
+REGISTRY: List[_Metric] = []
+
+HTTP_REQUEST_SECONDS = Histogram(
+    "collector_http_request_seconds", "Orchestrator API request latency", ("tenant", "endpoint", "status"))
+HTTP_RETRIES = Counter(
+    "collector_http_retries_total", "Orchestrator API requests that were retried", ("tenant", "endpoint"))
+DB_WRITE_SECONDS = Histogram(
+    "collector_db_write_seconds", "Duration of one table write", ("schema", "table"))
+DB_ROWS_WRITTEN = Counter(
+    "collector_db_rows_written_total", "Rows written to MySQL", ("schema", "table"))
+DB_LAST_WRITE = Gauge(
+    "collector_db_last_write_timestamp_seconds", "Unix time of the last successful write to a table", ("schema", "table"))
+SPOOL_PENDING_BYTES = Gauge(
+    "collector_spool_pending_bytes", "Size of the writes waiting in the on-disk spool", ("schema",))
+SPOOL_EVICTED = Counter(
+    "collector_spool_evicted_total", "Spooled writes dropped for exceeding the spool size or age bounds", ("schema",))
+NORMALIZE_SECONDS = Histogram(
+    "collector_normalize_seconds", "Time spent turning API payloads into rows", ("schema", "table"))
+DEDUP_SKIPPED = Counter(
+    "collector_dedup_skipped_total", "Snapshot writes skipped because the payload was unchanged", ("schema", "table"))
+DEDUP_WRITTEN = Counter(
+    "collector_dedup_written_total", "Snapshot writes made because the payload changed", ("schema", "table"))
+PIPELINE_WAIT_SECONDS = Histogram(
+    "collector_pipeline_wait_seconds", "Time a pipeline stage waited for the stage before it", ("schema", "table", "stage"))
+TASK_SECONDS = Histogram(
+    "collector_task_seconds", "Duration of one scheduled task run", ("task",))
+TASK_LAST_SUCCESS = Gauge(
+    "collector_task_last_success_timestamp_seconds", "Unix time of the last successful task run", ("task",))
+TASK_SKIPPED = Counter(
+    "collector_task_skipped_total", "Task runs skipped because the previous run was still going", ("task",))
+ERRORS = Counter(
+    "collector_errors_total", "Errors caught and logged, by method", ("method",))
+
+
+def render() -> str:
+    return "\n".join(metric.render() for metric in REGISTRY) + "\n"
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        if self.path.split("?", 1)[0] != "/metrics":
+            self.send_error(404)
+            return
+        body = render().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+def start_metrics_server(port: int, host: str = "0.0.0.0") -> ThreadingHTTPServer:
+    """
+    Serve /metrics on a daemon thread and return the server.
+    """
+    server = ThreadingHTTPServer((host, port), _MetricsHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="metrics", daemon=True).start()
+    print(f"Metrics available on http://{host}:{port}/metrics")
+    return server
@@ -0,0 +1,79 @@
+import queue
+import threading
+import time
+from typing import Callable, Iterable, Iterator, Optional, TypeVar
+
+from metrics import PIPELINE_WAIT_SECONDS
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+_DONE = object()
+
+
+class _Failed:
+    def __init__(self, error: BaseException):
+        self.error = error
+
+
+def stage(
+    source: Iterable[T],
+    func: Optional[Callable[[T], R]] = None,
+    depth: int = 2,
+    labels: Optional[dict] = None
+) -> Iterator[R]:
+    """
+    Run one pipeline stage on its own thread: iterate source there, apply func to every item
+    and hand the results to the consumer through a queue of at most depth items.
+
+    Stages chain, e.g. stage(stage(pages), normalize) fetches the next page while the previous
+    one is normalized and the one before that is written, so a paged write takes about as long
+    as its slowest stage instead of the sum of all three. The bounded queue is the backpressure:
+    a stage that gets depth items ahead blocks until the consumer catches up, so memory stays
+    bounded by a few pages. Results arrive in source order and an exception raised in the stage
+    is raised again in the consumer. When the consumer stops early the stage stops too.
+
+    :param labels: schema/table/stage labels for PIPELINE_WAIT_SECONDS, which records how long
+        the consumer waited on this stage; a stage that is waited on a lot is the bottleneck.
+    """
+    results = queue.Queue(maxsize=depth)
+    stopped = threading.Event()
+
+    def put(item) -> bool:
+        while not stopped.is_set():
+            try:
+                results.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def run():
+        items = iter(source)
+        try:
+            for item in items:
+                if not put(func(item) if func else item):
+                    return
+            put(_DONE)
+        except BaseException as e:
+            put(_Failed(e))
+        finally:
+            # The source is only ever touched from this thread, so it is closed here as well
+            close = getattr(items, "close", None)
+            if close is not None:
+                close()
+
+    threading.Thread(target=run, name=f"stage-{(labels or {}).get('stage', 'pipeline')}", daemon=True).start()
+    try:
+        while True:
+            started = time.perf_counter()
+            item = results.get()
+            if labels:
+                PIPELINE_WAIT_SECONDS.observe(time.perf_counter() - started, **labels)
+            if item is _DONE:
+                return
+            if isinstance(item, _Failed):
+                raise item.error
+            yield item
+    finally:
+        stopped.set()
@@ -0,0 +1,247 @@
+"""
+Profiles every panel query of the shipped Grafana dashboards against a local MySQL.
+
+Each rawSql is pointed at one scratch schema (tenant schemas such as aspenhealthcare_DB,
+${tenant}_DB and global are all rewritten to it), EXPLAINed and timed. The report lists
+p50/p95 latency per query, the rows MySQL expects to examine, and whether the plan does a
+full table scan, a filesort or a temporary table, slowest first. Identical queries from
+several panels (e.g. one per tenant on the one-pager) are profiled once.
+
+The schema is loaded the way production is: one full collector cycle runs against the
+synthetic replay server, so tables, column types, indexes and partitions are the ones the
+collector creates. The append-only tables are then extended backwards in time to --days of
+history, as if the collector had been running every --interval seconds.
+
+    docker run -d -e MYSQL_ROOT_PASSWORD=bench -p 3306:3306 mysql:latest
+    DB_HOST=127.0.0.1 DB_USER=root DB_PASSWORD=bench python profile_dashboards.py --days 90 --folders 20
+    DB_HOST=127.0.0.1 DB_USER=root DB_PASSWORD=bench python profile_dashboards.py --no-load queues.json
+"""
+import argparse
+import json
+import os
+import re
+import time
+from typing import Dict, List
+
+import pymysql
+
+from main import REALTIME_TASKS, TIMESERIES_TASKS
+from MySQLSchema import SURROGATE_KEY
+from MySQLWriter import MySQLConnectionPool
+from OrchestratorDataInserter import APPEND_TABLES, OrchestratorDataInserter
+from OrchestratorTenantClient import OrchestratorTenantClient
+from replay_server import start_replay_server
+
+DASHBOARDS = ["one_pager.json", "processes.json", "queues.json"]
+
+# Tenant schema qualifiers used in the dashboards: literal tenant schemas, the ${tenant} variable and the shared schema
+SCHEMA_QUALIFIER = re.compile(r"(?:\$\{tenant\}|\$tenant|\w+)_DB\.|\bglobal\.")
+
+# Grafana time macros, bound to the last day
+GRAFANA_MACROS = [
+    (re.compile(r"\$__timeFilter\(([^)]+)\)"), r"\1 BETWEEN NOW() - INTERVAL 1 DAY AND NOW()"),
+    (re.compile(r"\$__timeFrom\(\)"), "(NOW() - INTERVAL 1 DAY)"),
+    (re.compile(r"\$__timeTo\(\)"), "NOW()"),
+]
+
+
+def extract_panel_queries(path: str) -> List[Dict]:
+    """
+    Every non-empty rawSql in a dashboard JSON, with the title of the panel it belongs to.
+    """
+    with open(path) as dashboard_file:
+        dashboard = json.load(dashboard_file)
+    queries = []
+
+    def walk(node, title):
+        if isinstance(node, dict):
+            title = node.get("title") or title
+            if (node.get("rawSql") or "").strip():
+                queries.append({"dashboard": os.path.basename(path), "panel": title, "sql": node["rawSql"]})
+            for value in node.values():
+                walk(value, title)
+        elif isinstance(node, list):
+            for value in node:
+                walk(value, title)
+
+    walk(dashboard, None)
+    return queries
+
+
+def rewrite_query(sql: str, schema: str) -> str:
+    sql = SCHEMA_QUALIFIER.sub(f"`{schema}`.", sql)
+    for pattern, replacement in GRAFANA_MACROS:
+        sql = pattern.sub(replacement, sql)
+    return sql.strip().rstrip(";")
+
+
+def run_collector_cycle(pool: MySQLConnectionPool, schema: str, folders: int, queues: int):
+    server = start_replay_server(folders=folders, queues=queues)
+    url = f"http://127.0.0.1:{server.server_address[1]}/"
+    client = OrchestratorTenantClient("org", "tenant", "client", "token", base_url=url, auth_url=url + "oauth/token")
+    inserter = OrchestratorDataInserter(client, "", "", "", schema, pool=pool)
+    for task_name in TIMESERIES_TASKS + REALTIME_TASKS:
+        getattr(inserter, task_name)()
+    server.shutdown()
+
+
+def extend_history(pool: MySQLConnectionPool, schema: str, table_name: str, time_column: str,
+                   days: float, interval: float) -> int:
+    """
+    Copy a table's rows backwards in time until it holds `days` of history. Every copy shifts
+    all DATETIME columns by one collection period (the span of the rows plus `interval`), and
+    the number of rows doubles per INSERT ... SELECT, so a year of history takes a few statements.
+
+    Returns:
+        int: The number of rows in the table afterwards.
+    """
+    table = f"`{schema}`.`{table_name}`"
+    with pool.connection() as connection:
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT COLUMN_NAME, DATA_TYPE FROM information_schema.COLUMNS "
+                           "WHERE TABLE_SCHEMA = %s AND TABLE_NAME = %s ORDER BY ORDINAL_POSITION", (schema, table_name))
+            columns = {name: data_type for name, data_type in cursor.fetchall() if name != SURROGATE_KEY}
+            if time_column not in columns:
+                return 0
+            cursor.execute("SELECT COLUMN_NAME FROM information_schema.STATISTICS "
+                           "WHERE TABLE_SCHEMA = %s AND TABLE_NAME = %s AND INDEX_NAME = 'uq_natural_key'",
+                           (schema, table_name))
+            key_columns = {row[0] for row in cursor.fetchall()}
+            # A natural key without a time column stays unique only if its text columns change per copy
+            tag_key = not any(columns[col] in ("datetime", "timestamp") for col in key_columns)
+
+            cursor.execute(f"SELECT COUNT(*), TIMESTAMPDIFF(SECOND, MIN(`{time_column}`), MAX(`{time_column}`)) "
+                           f"FROM {table}")
+            base_rows, span = cursor.fetchone()
+            if not base_rows:
+                return 0
+            period = int((span or 0) + interval)
+            target = max(1, int(days * 86400 // period))
+
+            copies = 1
+            while copies < target:
+                batch = min(copies, target - copies)
+                expressions = []
+                for col, data_type in columns.items():
+                    if data_type in ("datetime", "timestamp"):
+                        expressions.append(f"`{col}` - INTERVAL {copies * period} SECOND")
+                    elif tag_key and col in key_columns and data_type in ("varchar", "char", "text"):
+                        expressions.append(f"CONCAT(`{col}`, '~{copies}')")
+                    else:
+                        expressions.append(f"`{col}`")
+                # Rows are copied in insertion order, so the first batch * base_rows rows are the newest copies
+                cursor.execute(
+                    f"INSERT INTO {table} ({', '.join(f'`{col}`' for col in columns)}) "
+                    f"SELECT {', '.join(expressions)} FROM {table} ORDER BY `{SURROGATE_KEY}` LIMIT {batch * base_rows}")
+                connection.commit()
+                copies += batch
+            cursor.execute(f"ANALYZE TABLE {table}")
+            cursor.fetchall()
+        connection.commit()
+    return base_rows * copies
+
+
+def load_synthetic_data(pool: MySQLConnectionPool, schema: str, folders: int, queues: int,
+                        days: float, interval: float):
+    with pool.connection() as connection:
+        with connection.cursor() as cursor:
+            cursor.execute(f"DROP DATABASE IF EXISTS `{schema}`")
+        connection.commit()
+    run_collector_cycle(pool, schema, folders, queues)
+    for table_name, time_column in APPEND_TABLES.items():
+        rows = extend_history(pool, schema, table_name, time_column, days, interval)
+        print(f"{table_name}: {rows} rows")
+
+
+def explain(cursor, sql: str) -> Dict:
+    cursor.execute("EXPLAIN " + sql)
+    names = [column[0].lower() for column in cursor.description]
+    plan = [dict(zip(names, row)) for row in cursor.fetchall()]
+    extras = " ".join(step.get("extra") or "" for step in plan)
+    return {
+        # Derived tables (<derived2>, <union1,2>) are scanned in memory; only base-table scans count
+        "full_scans": sorted({step["table"] for step in plan
+                              if step.get("type") == "ALL" and step.get("table") and not step["table"].startswith("<")}),
+        "filesort": "Using filesort" in extras,
+        "temporary": "Using temporary" in extras,
+        "examined": sum(int(step.get("rows") or 0) for step in plan),
+    }
+
+
+def percentile(values: List[float], fraction: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, max(0, round(fraction * len(ordered)) - 1))]
+
+
+def profile_query(pool: MySQLConnectionPool, sql: str, runs: int) -> Dict:
+    with pool.connection() as connection:
+        with connection.cursor() as cursor:
+            result = explain(cursor, sql)
+            cursor.execute(sql)  # Warm-up, not timed
+            result["returned"] = len(cursor.fetchall())
+            timings = []
+            for _ in range(runs):
+                started = time.perf_counter()
+                cursor.execute(sql)
+                cursor.fetchall()
+                timings.append(time.perf_counter() - started)
+        connection.commit()
+    result["p50"] = percentile(timings, 0.5)
+    result["p95"] = percentile(timings, 0.95)
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("dashboards", nargs="*", default=DASHBOARDS)
+    parser.add_argument("--schema", default="dashboard_profile_DB", help="scratch schema, dropped and reloaded")
+    parser.add_argument("--no-load", action="store_true", help="profile the schema as it is")
+    parser.add_argument("--folders", type=int, default=10)
+    parser.add_argument("--queues", type=int, default=20)
+    parser.add_argument("--days", type=float, default=30, help="history kept in the append-only tables")
+    parser.add_argument("--interval", type=float, default=600, help="seconds between simulated collector runs")
+    parser.add_argument("--runs", type=int, default=20, help="timed executions per query")
+    args = parser.parse_args()
+
+    pool = MySQLConnectionPool(host=os.getenv("DB_HOST", "127.0.0.1"), user=os.getenv("DB_USER", "root"),
+                               password=os.getenv("DB_PASSWORD", ""))
+    if not args.no_load:
+        load_synthetic_data(pool, args.schema, args.folders, args.queues, args.days, args.interval)
+
+    # Group panels by the query they run once pointed at the scratch schema
+    panels_by_query: Dict[str, List[str]] = {}
+    for path in args.dashboards:
+        for query in extract_panel_queries(path):
+            # Copies of a panel differ only in layout whitespace
+            sql = " ".join(rewrite_query(query["sql"], args.schema).split())
+            panels_by_query.setdefault(sql, []).append(f"{query['dashboard']}: {query['panel']}")
+
+    results = []
+    for sql, panels in panels_by_query.items():
+        try:
+            results.append((panels, profile_query(pool, sql, args.runs)))
+        except pymysql.MySQLError as e:
+            results.append((panels, {"error": str(e)}))
+    pool.close()
+
+    print()
+    print(f"{'p50 ms':>8} {'p95 ms':>8} {'examined':>9} {'returned':>8}  {'plan':<34} panel")
+    for panels, result in sorted(results, key=lambda item: -item[1].get("p95", float("inf"))):
+        label = panels[0] + (f" (+{len(panels) - 1} more)" if len(panels) > 1 else "")
+        if "error" in result:
+            print(f"{'':>8} {'':>8} {'':>9} {'':>8}  {'ERROR ' + result['error'][:60]:<34} {label}")
+            continue
+        flags = ([f"SCAN {','.join(result['full_scans'])}"] if result["full_scans"] else []) \
+            + (["FILESORT"] if result["filesort"] else []) + (["TEMP"] if result["temporary"] else [])
+        print(f"{result['p50'] * 1000:>8.2f} {result['p95'] * 1000:>8.2f} {result['examined']:>9} "
+              f"{result['returned']:>8}  {' '.join(flags) or 'ok':<34} {label}")
+
+    profiled = [result for _, result in results if "error" not in result]
+    print()
+    print(f"{len(panels_by_query)} distinct queries from {sum(len(p) for p in panels_by_query.values())} panels: "
+          f"{sum(1 for r in profiled if r['full_scans'])} with full scans, "
+          f"{sum(1 for r in profiled if r['filesort'])} with filesorts, {len(results) - len(profiled)} failed")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,183 @@
+"""
+Serves a recording made by ResponseRecorder as a local Orchestrator stand-in.
+
+Recorded responses are matched on path and query, then on the folder header. Time-valued
+filters (a look-back start, a watermark, daysNo) are masked on both sides, since they change
+from run to run (see ResponseRecorder.replay_key()). Requests the
+recording does not cover fall back to the synthetic payloads of bench_fanout's mock server,
+so a partial recording (or none at all) still answers every endpoint the collector calls.
+Folder and queue counts can be scaled up beyond what was recorded. The folder and queue
+definition lists are then synthetic, and per-folder and per-queue requests reuse the responses
+recorded for the real folders and queues. The queues monitoring table is stretched to the
+queue count by repeating its recorded rows.
+
+    RECORD_FILE=recording.jsonl python main.py            # record against a live tenant
+    python replay_server.py --recording recording.jsonl --port 8080 --latency-ms 40
+"""
+import argparse
+import json
+import re
+import threading
+import time
+from collections import defaultdict
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+from bench_fanout import MockOrchestratorHandler, MockOrchestratorServer
+from ResponseRecorder import relative_path, replay_key
+
+# Queue definition id in a per-queue request such as RetrieveLastDaysProcessingRecords
+QUEUE_PARAMETER = re.compile(r"\bqueueDefinitionId=(\d+)")
+
+
+def load_recording(path: str) -> Dict[str, Dict[Optional[str], List[Dict]]]:
+    """
+    Index a recording by path and folder. Every response recorded for the same request is kept
+    and served in turn, so repeated polls see the data change as it did when it was recorded.
+    """
+    responses: Dict[str, Dict[Optional[str], List[Dict]]] = defaultdict(lambda: defaultdict(list))
+    with open(path, encoding="utf-8") as recording:
+        for line in recording:
+            if line.strip():
+                entry = json.loads(line)
+                responses[replay_key(entry["path"])][entry.get("folder")].append(entry)
+    return responses
+
+
+def queue_paths(recording: Dict[str, Dict]) -> Dict[str, List[str]]:
+    """
+    Group the recorded per-queue requests by their path with the queue id masked, so a request
+    for a queue that was not recorded can borrow the responses of one that was.
+    """
+    paths: Dict[str, List[str]] = defaultdict(list)
+    for path in sorted(recording):
+        if QUEUE_PARAMETER.search(path):
+            paths[QUEUE_PARAMETER.sub("queueDefinitionId=*", path)].append(path)
+    return paths
+
+
+def queue_table_rows(recording: Dict[str, Dict]) -> List[Dict]:
+    """
+    Rows of the recorded queues monitoring table, taken from the first response to each page.
+    """
+    rows = []
+    for path in sorted(recording):
+        if "GetQueuesTable" not in path:
+            continue
+        for entries in recording[path].values():
+            body = entries[0]["body"]
+            if isinstance(body, dict) and isinstance(body.get("data"), list):
+                rows.extend(body["data"])
+            break
+    return rows
+
+
+class ReplayHandler(MockOrchestratorHandler):
+    def _replayed(self) -> Optional[Tuple[int, object]]:
+        server = self.server
+        path = replay_key(relative_path(self.path))
+        by_folder = server.recording.get(path)
+        if not by_folder and server.scale_queues:
+            match = QUEUE_PARAMETER.search(path)
+            recorded = server.queue_paths.get(QUEUE_PARAMETER.sub("queueDefinitionId=*", path)) if match else None
+            if recorded:
+                # A scaled-up queue borrows the responses of a recorded one
+                path = recorded[int(match.group(1)) % len(recorded)]
+                by_folder = server.recording[path]
+        if not by_folder:
+            return None
+        folder = self.headers.get("X-UIPATH-OrganizationUnitId")
+        if folder not in by_folder:
+            # A scaled-up folder borrows the responses of a recorded one
+            recorded = sorted(by_folder, key=str)
+            folder = recorded[int(folder or 0) % len(recorded)] if folder and folder.isdigit() else recorded[0]
+        entries = by_folder[folder]
+        with server.lock:
+            turn = server.turns[(path, folder)]
+            server.turns[(path, folder)] = turn + 1
+        entry = entries[turn % len(entries)]
+        return entry["status"], entry["body"] if entry["body"] is not None else entry.get("text")
+
+    def _scaled_queues_table(self, path: str) -> Dict:
+        # The recorded rows repeated up to the queue count, each copy renamed to a queue of its own
+        server = self.server
+        rows = []
+        for i in range(1, server.queues + 1):
+            row = dict(server.queue_rows[(i - 1) % len(server.queue_rows)])
+            if "queueId" in row:
+                row["queueId"] = i
+            if "queueName" in row:
+                row["queueName"] = f"{row['queueName']} #{i}"
+            rows.append(row)
+        query = parse_qs(urlsplit(path).query)
+        page_no = int(query.get("pageNo", ["1"])[0])
+        page_size = int(query.get("pageSize", ["1000"])[0])
+        return {"data": rows[(page_no - 1) * page_size:page_no * page_size], "totalCount": len(rows)}
+
+    def do_GET(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        if length:
+            self.rfile.read(length)
+        time.sleep(self.server.latency)
+
+        path = relative_path(self.path)
+        if self.server.scale_queues and self.server.queue_rows and "GetQueuesTable" in path:
+            self._send(self._scaled_queues_table(path))
+            return
+        synthetic = (self.server.scale_folders and path.startswith("odata/Folders")) or \
+            (self.server.scale_queues and path.startswith("odata/QueueDefinitions") and "ListQueues" not in path)
+        replayed = None if synthetic or "oauth/token" in path else self._replayed()
+        if replayed is not None:
+            self._send(replayed[1], status=replayed[0])
+            return
+        payload = self._payload()
+        if payload is None:
+            self._send({"message": "not found"}, status=404)
+        else:
+            self._send(payload)
+
+    do_POST = do_GET
+
+
+def start_replay_server(recording: Optional[str] = None, folders: Optional[int] = None, queues: Optional[int] = None,
+                        latency_ms: float = 0.0, port: int = 0) -> MockOrchestratorServer:
+    """
+    Start a replay server on a daemon thread. folders/queues scale the synthetic folder and queue
+    lists, and the recorded per-folder and per-queue responses are reused to fill them; without
+    them a recording's own lists are served.
+    """
+    server = MockOrchestratorServer(("127.0.0.1", port), ReplayHandler)
+    server.recording = load_recording(recording) if recording else {}
+    server.scale_folders = folders is not None or not server.recording
+    server.scale_queues = queues is not None or not server.recording
+    server.queue_paths = queue_paths(server.recording)
+    server.queue_rows = queue_table_rows(server.recording)
+    server.folders = folders or 10
+    server.queues = queues or server.folders
+    server.latency = latency_ms / 1000.0
+    server.lock = threading.Lock()
+    server.turns = defaultdict(int)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--recording", help="JSONL file written by ResponseRecorder")
+    parser.add_argument("--folders", type=int,
+                        help="serve this many folders, reusing the recorded per-folder responses")
+    parser.add_argument("--queues", type=int,
+                        help="serve this many queue definitions, reusing the recorded per-queue responses")
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument("--port", type=int, default=8080)
+    args = parser.parse_args()
+
+    server = start_replay_server(args.recording, args.folders, args.queues, args.latency_ms, args.port)
+    url = f"http://127.0.0.1:{server.server_address[1]}/"
+    print(f"Replaying on {url} (token endpoint {url}oauth/token)")
+    while True:
+        time.sleep(3600)
+
+
+if __name__ == "__main__":
+    main()